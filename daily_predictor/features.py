@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 from config import TREND_EMA_FAST, TREND_EMA_SLOW, ATR_LEN, RANGE_VOL_MULT
@@ -11,10 +12,8 @@ def compute_atr(df: pd.DataFrame, length: int) -> pd.Series:
     close = df["Close"]
     prev_close = close.shift(1)
 
-    tr1 = high - low
-    tr2 = (high - prev_close).abs()
-    tr3 = (low - prev_close).abs()
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+    # Elementwise max of the three ranges (NaN-skipping, like max(axis=1)) without building a 3-column frame
+    tr = np.fmax(high - low, np.fmax((high - prev_close).abs(), (low - prev_close).abs()))
     return tr.rolling(length).mean()
 
 
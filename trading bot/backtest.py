@@ -1,110 +1,306 @@
 """
 Backtest the strategy on historical data to estimate average number of trades.
-Uses same math-based signals and 1:4 SL/TP (tick-based for MGC/MNQ). News disabled (no history).
-Run: python backtest.py
+Uses same math-based signals and 1:4 SL/TP (tick-based for MGC/MNQ). News is off unless --news, which
+replays headlines from the local news store (news_store.py) through the live news gate.
+Signals for all bars are computed once (vectorized); --slow recomputes per bar like the live path.
+Run: python backtest.py [--slow] [--verify] [--news] [--report DIR [--format csv|parquet]]
 """
 
+import argparse
+import numpy as np
 import pandas as pd
 
-from config import SYMBOLS, SL_TP_TICKS, TICK_SIZES, USE_SL_TP, ATR_PERIOD, RISK_REWARD_RATIO, STOP_LOSS_ATR_MULT
-from data import get_prices, get_atr
-from strategy import get_signals_from_df, _lookback
+import price_cache
+from config import (
+    SYMBOLS, BAR_INTERVAL, INTRABAR_PATH_MODEL, INTRABAR_FINE_INTERVAL, INDICATOR_BACKEND,
+    SESSION_TIMEZONE, SESSION_CLOSE_TIME,
+)
+from data import get_prices, INTERVAL_SECONDS, DAILY
+from params import StrategyParams, DEFAULT_PARAMS
+from strategy import get_signals_from_df, get_signal_series, verify_backends
+from news import sentiment_asof
+from report import build_report, write_report, parquet_available
 
 
-def _atr_from_df(df: pd.DataFrame, period: int = 14) -> float | None:
-    """ATR at last bar of df (for ATR-based SL/TP fallback)."""
-    if df is None or len(df) < period + 2:
+def _per_bar_signals(
+    symbol: str,
+    df: pd.DataFrame,
+    start: int,
+    params: StrategyParams | None = None,
+    sentiment: pd.Series | None = None,
+) -> pd.Series:
+    """Reference path: recompute every indicator on df.iloc[: i + 1] for each bar (O(n²))."""
+    signals = pd.Series("HOLD", index=df.index, dtype=object)
+    for i in range(start, len(df)):
+        news = None
+        if sentiment is not None:
+            value = sentiment.iloc[i]
+            news = {symbol: None if pd.isna(value) else float(value)}
+        signals.iloc[i] = get_signals_from_df(
+            symbol, df.iloc[: i + 1], use_news=sentiment is not None, params=params, news=news
+        )
+    return signals
+
+
+def bar_close_times(index: pd.DatetimeIndex, interval: str = BAR_INTERVAL) -> pd.DatetimeIndex:
+    """
+    When each bar closes. Intraday: label + interval. Daily: SESSION_CLOSE_TIME (SESSION_TIMEZONE)
+    on the bar's date, not label + 24h, which for futures lands hours after the session closed.
+    Naive timestamps are taken as SESSION_TIMEZONE.
+    """
+    index = pd.DatetimeIndex(index)
+    if interval != DAILY:
+        return index + pd.Timedelta(seconds=INTERVAL_SECONDS[interval])
+    local = index.tz_convert(SESSION_TIMEZONE) if index.tz is not None else index.tz_localize(SESSION_TIMEZONE)
+    return local.normalize() + pd.Timedelta(SESSION_CLOSE_TIME + ":00")
+
+
+def bar_sentiment(symbol: str, df: pd.DataFrame, interval: str = BAR_INTERVAL) -> pd.Series:
+    """News sentiment from the news store as of each bar's close (bar_close_times), when its signal is acted on."""
+    return pd.Series(sentiment_asof(symbol, bar_close_times(df.index, interval)).to_numpy(), index=df.index)
+
+
+def verify_signals(
+    symbol: str,
+    df: pd.DataFrame,
+    params: StrategyParams | None = None,
+    sentiment: pd.Series | None = None,
+) -> list:
+    """Dates where the vectorized signal differs from the per-bar signal (empty = identical); sentiment applies the news gate."""
+    fast = get_signal_series(df, params, sentiment)
+    slow = _per_bar_signals(symbol, df, start=0, params=params, sentiment=sentiment)
+    return list(df.index[fast.to_numpy() != slow.to_numpy()])
+
+
+PATH_MODELS = ("stop_first", "take_profit_first", "ohlc")
+
+
+def _first_hit(
+    lows: np.ndarray,
+    highs: np.ndarray,
+    sells: np.ndarray,
+    start: int,
+    sl_price: float,
+    tp_price: float,
+    use_sl_tp: bool,
+) -> int:
+    """
+    Index of the first bar from start where SL or TP is touched or SELL fires; -1 if none.
+    Scans in doubling numpy chunks, so a whole backtest costs O(bars) array work, not a Python loop per bar.
+    """
+    n = len(lows)
+    size = 64
+    while start < n:
+        end = min(n, start + size)
+        hits = sells[start:end]
+        if use_sl_tp:
+            hits = hits | (lows[start:end] <= sl_price) | (highs[start:end] >= tp_price)
+        if hits.any():
+            return start + int(hits.argmax())
+        start = end
+        size *= 2
+    return -1
+
+
+def _path_exit(
+    open_: float,
+    high: float,
+    low: float,
+    close: float,
+    sl_price: float,
+    tp_price: float,
+    path_model: str,
+) -> tuple[float, str]:
+    """
+    (exit_price, reason) for a bar that touches SL and/or TP, using the OHLC path model:
+    stop_first / take_profit_first pick that level when both are touched (stop_first = old behaviour);
+    ohlc fills at the open if the bar gaps through a level, else assumes O->L->H->C for an up bar
+    and O->H->L->C for a down bar.
+    """
+    hit_sl = low <= sl_price
+    hit_tp = high >= tp_price
+    if path_model == "ohlc":
+        if open_ <= sl_price:
+            return open_, "SL"
+        if open_ >= tp_price:
+            return open_, "TP"
+        if hit_sl and hit_tp:
+            return (sl_price, "SL") if close >= open_ else (tp_price, "TP")
+    elif hit_sl and hit_tp:
+        return (tp_price, "TP") if path_model == "take_profit_first" else (sl_price, "SL")
+    return (sl_price, "SL") if hit_sl else (tp_price, "TP")
+
+
+def _resolve_with_fine_bars(
+    fine: pd.DataFrame | None,
+    bar_start: pd.Timestamp,
+    bar_end: pd.Timestamp | None,
+    sl_price: float,
+    tp_price: float,
+    path_model: str,
+) -> tuple[float, str] | None:
+    """Walk finer bars inside [bar_start, bar_end) to see which level was touched first. None if no fine bars."""
+    if fine is None:
+        return None
+    sub = fine.loc[bar_start:] if bar_end is None else fine[(fine.index >= bar_start) & (fine.index < bar_end)]
+    if sub.empty:
         return None
-    high = df["High"]
-    low = df["Low"]
-    close = df["Close"]
-    prev = close.shift(1)
-    tr = pd.concat([
-        high - low,
-        (high - prev).abs(),
-        (low - prev).abs(),
-    ], axis=1).max(axis=1)
-    atr = tr.rolling(period).mean()
-    val = atr.iloc[-1]
-    if pd.isna(val) or val <= 0:
+    lows = sub["Low"].to_numpy(dtype=float)
+    highs = sub["High"].to_numpy(dtype=float)
+    hits = (lows <= sl_price) | (highs >= tp_price)
+    if not hits.any():
         return None
-    return float(val)
-
-
-def _sl_tp_prices(symbol: str, entry_price: float, df_sub: pd.DataFrame) -> tuple[float, float]:
-    """Compute SL and TP prices for a long at entry_price. Uses ticks if configured else ATR."""
-    if symbol in SL_TP_TICKS and symbol in TICK_SIZES:
-        risk_ticks, reward_ticks = SL_TP_TICKS[symbol]
-        tick = TICK_SIZES[symbol]
-        sl = entry_price - risk_ticks * tick
-        tp = entry_price + reward_ticks * tick
-        return sl, tp
-    atr = _atr_from_df(df_sub, period=ATR_PERIOD)
-    if atr is not None and atr > 0:
-        risk = STOP_LOSS_ATR_MULT * atr
-        reward = RISK_REWARD_RATIO * risk
-        return entry_price - risk, entry_price + reward
-    return entry_price - 0.01, entry_price + 0.01 * RISK_REWARD_RATIO
-
-
-def run_backtest(days: int = 365) -> dict:
+    k = int(hits.argmax())
+    row = sub.iloc[k]
+    return _path_exit(float(row["Open"]), highs[k], lows[k], float(row["Close"]), sl_price, tp_price, path_model)
+
+
+def _simulate(
+    symbol: str,
+    df: pd.DataFrame,
+    signals: pd.Series,
+    start: int,
+    params: StrategyParams | None = None,
+    path_model: str = INTRABAR_PATH_MODEL,
+    fine: pd.DataFrame | None = None,
+) -> list:
+    """
+    From start, enter at the close of each BUY bar and exit on SL, TP or SELL (at close).
+    Exit bars are found with vectorized scans, jumping from trade to trade. When one bar touches
+    both SL and TP, fine (finer-interval bars, if any) decides which came first, else path_model.
+    """
+    if path_model not in PATH_MODELS:
+        raise ValueError(f"Unknown path model {path_model!r}; expected one of {PATH_MODELS}")
+    p = params or DEFAULT_PARAMS
+    highs = df["High"].to_numpy(dtype=float)
+    lows = df["Low"].to_numpy(dtype=float)
+    closes = df["Close"].to_numpy(dtype=float)
+    opens = df["Open"].to_numpy(dtype=float) if "Open" in df else closes
+    sigs = signals.to_numpy()
+    # SL/TP distances for an entry on every bar, computed once (same columns as the live path)
+    distances = p.sl_tp_distances(symbol, df)
+    risks = distances["risk"].to_numpy()
+    rewards = distances["reward"].to_numpy()
+    buys = np.flatnonzero(sigs == "BUY")
+    sells = sigs == "SELL"
+    trades = []
+
+    i = start
+    while True:
+        b = np.searchsorted(buys, i)
+        if b >= len(buys):
+            break
+        k = int(buys[b])
+        entry_price = float(closes[k])
+        if p.use_sl_tp:
+            sl_price, tp_price = entry_price - risks[k], entry_price + rewards[k]
+        else:
+            sl_price, tp_price = entry_price - 0.01, entry_price + 0.01
+        j = _first_hit(lows, highs, sells, k + 1, sl_price, tp_price, p.use_sl_tp)
+        if j < 0:
+            break  # still open at the end of the data
+        if p.use_sl_tp and (lows[j] <= sl_price or highs[j] >= tp_price):
+            both = lows[j] <= sl_price and highs[j] >= tp_price
+            resolved = None
+            if both:
+                bar_end = df.index[j + 1] if j + 1 < len(df) else None
+                resolved = _resolve_with_fine_bars(fine, df.index[j], bar_end, sl_price, tp_price, path_model)
+            exit_price, reason = resolved or _path_exit(
+                opens[j], highs[j], lows[j], closes[j], sl_price, tp_price, path_model
+            )
+        else:
+            exit_price, reason = float(closes[j]), "SIGNAL"
+        trades.append((df.index[k], df.index[j], entry_price, float(exit_price), reason))
+        i = j + 1
+
+    return trades
+
+
+def load_fine_bars(symbol: str, interval: str = BAR_INTERVAL) -> pd.DataFrame | None:
+    """INTRABAR_FINE_INTERVAL bars from the local cache (never downloaded), if finer than interval."""
+    if not INTRABAR_FINE_INTERVAL or INTERVAL_SECONDS[INTRABAR_FINE_INTERVAL] >= INTERVAL_SECONDS[interval]:
+        return None
+    return price_cache.load_bars(symbol, INTRABAR_FINE_INTERVAL)
+
+
+def backtest_symbol(
+    symbol: str,
+    df: pd.DataFrame,
+    params: StrategyParams | None = None,
+    fast: bool = True,
+    path_model: str = INTRABAR_PATH_MODEL,
+    fine: pd.DataFrame | None = None,
+    sentiment: pd.Series | None = None,
+) -> list:
+    """
+    Trades for one symbol over df: list of (entry_date, exit_date, entry_price, exit_price, reason).
+    path_model / fine resolve bars that touch both SL and TP (see _simulate).
+    sentiment (per bar of df, e.g. bar_sentiment) applies the news gate; None = news off.
+    """
+    p = params or DEFAULT_PARAMS
+    lookback = p.lookback()
+    if df is None or len(df) < lookback:
+        return []
+    if fast:
+        signals = get_signal_series(df, p, sentiment)
+    else:
+        signals = _per_bar_signals(symbol, df, start=lookback, params=p, sentiment=sentiment)
+    return _simulate(symbol, df, signals, start=lookback, params=p, path_model=path_model, fine=fine)
+
+
+def run_backtest(
+    days: int = 365,
+    fast: bool = True,
+    params: StrategyParams | None = None,
+    frames: dict[str, pd.DataFrame] | None = None,
+    use_news: bool = False,
+) -> dict:
     """
     Run backtest for each symbol. Returns dict: symbol -> list of (entry_date, exit_date, entry_price, exit_price, reason).
+    fast=True computes all signals in one vectorized pass (O(n)); fast=False recomputes per bar (O(n²)).
+    params defaults to DEFAULT_PARAMS (config.py). frames (symbol -> bars) skips the download.
+    use_news applies the news gate with sentiment replayed from the news store.
     """
-    lookback = _lookback()
     all_trades = {}
-
     for symbol in SYMBOLS:
-        df = get_prices(symbol, days=days)
-        if df is None or len(df) < lookback:
-            all_trades[symbol] = []
-            continue
-
-        position = None  # (entry_price, sl_price, tp_price, entry_date)
-        trades = []
-
-        for i in range(lookback, len(df)):
-            row = df.iloc[i]
-            high, low, close = float(row["High"]), float(row["Low"]), float(row["Close"])
-            date = df.index[i]
-            df_sub = df.iloc[: i + 1]
-
-            signal = get_signals_from_df(symbol, df_sub, use_news=False)
-
-            if position is None:
-                if signal == "BUY":
-                    entry_price = close
-                    if USE_SL_TP:
-                        sl_price, tp_price = _sl_tp_prices(symbol, entry_price, df_sub)
-                    else:
-                        sl_price, tp_price = entry_price - 0.01, entry_price + 0.01
-                    position = (entry_price, sl_price, tp_price, date)
-            else:
-                entry_price, sl_price, tp_price, entry_date = position
-                exit_price = None
-                reason = None
-                if USE_SL_TP and low <= sl_price:
-                    exit_price = sl_price
-                    reason = "SL"
-                elif USE_SL_TP and high >= tp_price:
-                    exit_price = tp_price
-                    reason = "TP"
-                elif signal == "SELL":
-                    exit_price = close
-                    reason = "SIGNAL"
-                if exit_price is not None:
-                    trades.append((entry_date, date, entry_price, exit_price, reason))
-                    position = None
-
-        all_trades[symbol] = trades
-
+        df = frames.get(symbol) if frames is not None else get_prices(symbol, days=days)
+        sentiment = bar_sentiment(symbol, df) if use_news and df is not None else None
+        all_trades[symbol] = backtest_symbol(symbol, df, params, fast, fine=load_fine_bars(symbol), sentiment=sentiment)
     return all_trades
 
 
 def main():
-    print("Backtesting strategy (math + 1:4 SL/TP, news OFF)...")
+    parser = argparse.ArgumentParser(description="Backtest the volume + math strategy")
+    parser.add_argument("--slow", action="store_true", help="Recompute signals per bar (reference path)")
+    parser.add_argument("--news", action="store_true", help="Apply the news gate using headlines in the news store")
+    parser.add_argument("--verify", action="store_true", help="Check vectorized signals match the per-bar path")
+    parser.add_argument("--report", metavar="DIR", help="Write performance report (tables + report.html) to DIR")
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv", help="Report table format")
+    args = parser.parse_args()
+    if args.report and args.format == "parquet" and not parquet_available():
+        parser.error("--format parquet needs pyarrow (pip install pyarrow) or fastparquet")
+
+    if args.verify:
+        ok = True
+        for symbol in SYMBOLS:
+            df = get_prices(symbol, days=365)
+            if df is None:
+                print(f"  {symbol}: no data")
+                continue
+            mismatches = verify_signals(symbol, df)
+            ok = ok and not mismatches
+            status = "OK" if not mismatches else f"{len(mismatches)} mismatched bars (first: {mismatches[0]})"
+            print(f"  {symbol}: {len(df)} bars, {status}")
+            if INDICATOR_BACKEND != "pandas":
+                diffs = verify_backends(df)
+                ok = ok and all(d <= 1e-8 for d in diffs.values())
+                print(f"    {INDICATOR_BACKEND} vs pandas: " + ", ".join(f"{k} max diff {d:.1e}" for k, d in diffs.items()))
+        raise SystemExit(0 if ok else 1)
+
+    print(f"Backtesting strategy (math + 1:4 SL/TP, news {'from news store' if args.news else 'OFF'})...")
     print("Fetching data...")
-    all_trades = run_backtest(days=365)
+    frames = {symbol: get_prices(symbol, days=365) for symbol in SYMBOLS}
+    all_trades = run_backtest(days=365, fast=not args.slow, frames=frames, use_news=args.news)
 
     total = 0
     for symbol in SYMBOLS:
@@ -123,8 +319,18 @@ def main():
         print(f"  Average trades per year: ~{total:.1f}")
     else:
         print("  Average trades per month: 0 (no trades in backtest)")
+    if args.report:
+        report = build_report(all_trades, frames)
+        summary = report["summary"]
+        if summary["trades"]:
+            print(f"  Win rate: {summary['win_rate']:.1%}  Profit factor: {summary['profit_factor']:.2f}  "
+                  f"Expectancy: ${summary['expectancy']:,.2f} ({summary['expectancy_r']:+.2f}R)")
+            print(f"  Max drawdown: {summary['max_drawdown']:.2%}  Sharpe: {summary['sharpe']:.2f}  "
+                  f"Sortino: {summary['sortino']:.2f}  Exposure: {summary['exposure']:.1%}")
+        print(f"  Report: {write_report(report, args.report, args.format)}")
     print()
-    print("Note: Backtest uses price/volume only (no news). Live trading may differ.")
+    if not args.news:
+        print("Note: Backtest uses price/volume only (no news; --news replays stored headlines). Live trading may differ.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,362 @@
+"""
+Offline benchmark suite for the strategy, backtest, paper trader and news layers.
+Runs on synthetic OHLCV bars (1k / 10k / 100k / 1M by default) with yfinance replaced by a stub
+that refuses network calls, and writes timings as JSON so runs can be compared between commits.
+
+Run:
+  python bench.py                                  # all cases -> bench_results/bench_<commit>_<time>.json
+  python bench.py --sizes 1000 10000 --filter indicator
+  python bench.py --compare bench_results/<older>.json   # run, then compare against an older result
+  python bench.py --compare old.json new.json      # compare two saved results without running
+  python bench.py --verify                         # offline check: vectorized == per-bar signals and trades
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import config
+
+
+def _offline_yfinance() -> None:
+    """Install a yfinance stand-in whose downloads raise, so no benchmark can touch the network."""
+    stub = types.ModuleType("yfinance")
+
+    def offline(*args, **kwargs):
+        raise RuntimeError("bench.py runs offline; yfinance is stubbed")
+
+    class Ticker:
+        def __init__(self, symbol: str):
+            self.symbol = symbol
+
+        news = property(offline)
+        history = offline
+
+    stub.download = offline
+    stub.Ticker = Ticker
+    sys.modules["yfinance"] = stub
+
+
+# Stub the network and keep every on-disk store in a scratch folder before importing the bot modules
+_offline_yfinance()
+_SCRATCH = Path(tempfile.mkdtemp(prefix="bench_"))
+config.PRICE_CACHE_PATH = _SCRATCH / "prices.sqlite"
+config.NEWS_STORE_PATH = _SCRATCH / "news.sqlite"
+config.JOURNAL_PATH = _SCRATCH / "paper_journal.sqlite"
+
+import news  # noqa: E402
+import strategy  # noqa: E402
+import volatility  # noqa: E402
+from backtest import backtest_symbol, run_backtest, verify_signals  # noqa: E402
+from data import MarketSnapshot  # noqa: E402
+from paper_trader import PaperTrader  # noqa: E402
+from streaming import StreamingSignals  # noqa: E402
+from params import DEFAULT_PARAMS  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+VERIFY_SIZES = (300, 800)  # the per-bar reference path is O(n²)
+VERIFY_SEEDS = (0, 1, 2)
+STREAM_VERIFY_BARS = 5_000  # streaming is O(n); long enough to cross its periodic re-summing
+RESULTS_DIR = Path(__file__).resolve().parent / "bench_results"
+
+
+def synthetic_bars(n: int, seed: int = 0, start_price: float = 100.0) -> pd.DataFrame:
+    """n one-minute OHLCV bars of a geometric random walk (same bars for the same n and seed)."""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.concatenate(([start_price], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.0015, (2, n))) * close
+    index = pd.date_range(end="2025-01-01", periods=n, freq="1min", tz="UTC", name="Date")
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) + wick[0],
+        "Low": np.minimum(open_, close) - wick[1],
+        "Close": close,
+        "Volume": rng.lognormal(8, 0.6, n).round(),
+    }, index=index)
+
+
+def synthetic_headlines(n: int, seed: int = 0) -> list[str]:
+    """n headlines of 6–16 words, about one in eight from the sentiment lexicon or negations."""
+    rng = np.random.default_rng(seed)
+    filler = np.array("gold futures traders said on tuesday as investors weigh fed rate outlook amid "
+                      "inflation data from china and europe".split())
+    lexicon = np.array(sorted(news.POSITIVE_WORDS | news.NEGATIVE_WORDS | news.NEGATION_WORDS))
+    lengths = rng.integers(6, 17, n)
+    words = np.where(rng.random(lengths.sum()) < 0.12,
+                     lexicon[rng.integers(0, len(lexicon), lengths.sum())],
+                     filler[rng.integers(0, len(filler), lengths.sum())])
+    bounds = np.concatenate(([0], np.cumsum(lengths)))
+    return [" ".join(words[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def _clear_caches() -> None:
+    volatility._CACHE.clear()
+    strategy.clear_indicator_cache()
+
+
+def _indicator(func):
+    """Case builder calling func(df, params) on fresh bars (cached series cleared before each run)."""
+    def build(size):
+        df = synthetic_bars(size)
+        return (lambda: func(df, DEFAULT_PARAMS)), _clear_caches
+    return build
+
+
+def _signals_last_bar(size):
+    df = synthetic_bars(size)
+    df.loc[df.index[-1], "Volume"] = df["Volume"].max() * 2  # pass the volume gate so every indicator runs
+    return (lambda: strategy.get_signals_from_df(config.SYMBOLS[0], df, use_news=False)), _clear_caches
+
+
+def _signals_all_bars(size):
+    df = synthetic_bars(size)
+    return (lambda: strategy.get_signal_series(df)), _clear_caches
+
+
+def _backtest(size):
+    frames = {symbol: synthetic_bars(size, seed=i) for i, symbol in enumerate(config.SYMBOLS)}
+    return (lambda: run_backtest(frames=frames)), _clear_caches
+
+
+def _market():
+    snapshot = MarketSnapshot(frames={symbol: synthetic_bars(500, seed=i) for i, symbol in enumerate(config.SYMBOLS)})
+    return snapshot, snapshot.context(list(config.SYMBOLS), DEFAULT_PARAMS.atr_period, params=DEFAULT_PARAMS)
+
+
+def _paper_buy_sell(size):
+    """size buy + sell round trips, alternating symbols."""
+    snapshot, market = _market()
+    prices = [snapshot.latest_price(symbol) for symbol in config.SYMBOLS]
+
+    def run():
+        trader = PaperTrader()
+        for i in range(size):
+            k = i % len(prices)
+            trader.buy(config.SYMBOLS[k], 1, prices[k], market)
+            trader.sell(config.SYMBOLS[k], 1, prices[k] * 1.001)
+    return run, None
+
+
+def _paper_total_value(size):
+    """size equity valuations with every symbol held."""
+    snapshot, market = _market()
+    trader = PaperTrader()
+    for symbol in config.SYMBOLS:
+        trader.buy(symbol, 1, snapshot.latest_price(symbol), market)
+
+    def run():
+        for _ in range(size):
+            trader.total_value(market)
+    return run, None
+
+
+def _sentiment_each(size):
+    texts = synthetic_headlines(size)
+    return (lambda: [news._sentiment_score(t) for t in texts]), None
+
+
+def _sentiment_batch(size):
+    texts = synthetic_headlines(size)
+    return (lambda: news.score_headlines(texts)), None
+
+
+# name -> (builder(size) -> (run, reset or None), largest size run)
+CASES = {
+    "signals.get_signals_from_df": (_signals_last_bar, None),
+    "signals.get_signal_series": (_signals_all_bars, None),
+    "indicator.obv": (_indicator(lambda df, p: strategy._obv(df)), None),
+    "indicator.bollinger": (_indicator(lambda df, p: strategy._bollinger_bands(df["Close"], p.bb_period, p.bb_std)), None),
+    "indicator.rsi": (_indicator(lambda df, p: strategy._rsi(df["Close"], p.rsi_period)), None),
+    "indicator.macd": (_indicator(lambda df, p: strategy._macd(df["Close"], p.macd_fast, p.macd_slow, p.macd_signal)), None),
+    "indicator.adx": (_indicator(lambda df, p: strategy._adx(df["High"], df["Low"], df["Close"], p.adx_period)), None),
+    "indicator.adx_pandas": (_indicator(lambda df, p: strategy._adx_pandas(df["High"], df["Low"], df["Close"], p.adx_period)), None),
+    "indicator.mfi": (_indicator(lambda df, p: strategy._mfi(df["High"], df["Low"], df["Close"], df["Volume"], p.mfi_period)), None),
+    "indicator.mfi_pandas": (_indicator(
+        lambda df, p: strategy._mfi_pandas(df["High"], df["Low"], df["Close"], df["Volume"], p.mfi_period)), None),
+    "indicator.stochastic": (_indicator(
+        lambda df, p: strategy._stochastic(df["High"], df["Low"], df["Close"], p.stoch_k_period, p.stoch_d_period)), None),
+    "indicator.zscore": (_indicator(lambda df, p: strategy._zscore(df["Close"], p.zscore_period)), None),
+    "indicator.atr": (_indicator(lambda df, p: volatility.atr_series(df, p.atr_period)), None),
+    "backtest.run_backtest": (_backtest, None),
+    "paper_trader.buy_sell": (_paper_buy_sell, 100_000),
+    "paper_trader.total_value": (_paper_total_value, 100_000),
+    "news.sentiment_score": (_sentiment_each, 100_000),
+    "news.score_headlines": (_sentiment_batch, None),
+}
+
+
+def time_case(run, reset=None, min_time: float = 0.5, max_repeats: int = 20) -> dict:
+    """Run until min_time has been spent (at least once, at most max_repeats); seconds per run."""
+    times = []
+    while not times or (sum(times) < min_time and len(times) < max_repeats):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {
+        "repeats": len(times),
+        "min": min(times),
+        "median": float(np.median(times)),
+        "mean": float(np.mean(times)),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        root = Path(__file__).resolve().parent
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", "."], cwd=root,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(sizes=SIZES, name_filter: str | None = None, min_time: float = 0.5) -> dict:
+    """Time every case (whose name contains name_filter) at every size; returns the JSON document."""
+    results = {}
+    for name, (build, max_size) in CASES.items():
+        if name_filter and name_filter not in name:
+            continue
+        for size in sizes:
+            if max_size is not None and size > max_size:
+                continue
+            run, reset = build(size)
+            timing = time_case(run, reset, min_time)
+            results[f"{name}[{size}]"] = {"name": name, "size": size, **timing}
+            print(f"  {name:<30} {size:>9,}  {timing['min'] * 1e3:>10.2f} ms  (x{timing['repeats']})", flush=True)
+    return {
+        "commit": _git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": f"{platform.system()} {platform.machine()}",
+        "indicator_backend": config.INDICATOR_BACKEND,
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict, threshold: float = 1.2) -> list[str]:
+    """Print new/old min-time ratios for cases in both results; returns the keys slower than threshold."""
+    print(f"\n  {'case':<42} {'old ms':>10} {'new ms':>10} {'ratio':>7}   ({old['commit']} -> {new['commit']})")
+    slower = []
+    for key, result in new["results"].items():
+        before = old["results"].get(key)
+        if before is None:
+            continue
+        ratio = result["min"] / before["min"] if before["min"] > 0 else float("inf")
+        flag = "  SLOWER" if ratio > threshold else ("  faster" if ratio < 1 / threshold else "")
+        if ratio > threshold:
+            slower.append(key)
+        print(f"  {key:<42} {before['min'] * 1e3:>10.2f} {result['min'] * 1e3:>10.2f} {ratio:>6.2f}x{flag}")
+    return slower
+
+
+def synthetic_sentiment(index: pd.DatetimeIndex, seed: int = 0) -> pd.Series:
+    """Per-bar news sentiment in [-1, 1] with about a third of the bars missing (no headlines)."""
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(-1, 1, len(index))
+    values[rng.random(len(index)) < 0.3] = np.nan
+    return pd.Series(values, index=index)
+
+
+def _streaming_mismatches(df: pd.DataFrame, params) -> list:
+    """Dates where StreamingSignals fed bar by bar differs from get_signal_series (news off)."""
+    _clear_caches()
+    stream = StreamingSignals(params)
+    streamed = [stream.update(*bar) for bar in df[["High", "Low", "Close", "Volume"]].itertuples(index=False)]
+    batch = strategy.get_signal_series(df, params)
+    return list(df.index[batch.to_numpy() != np.array(streamed, dtype=object)])
+
+
+def verify_offline(sizes=VERIFY_SIZES, seeds=VERIFY_SEEDS) -> bool:
+    """
+    Equivalence check on synthetic bars: vectorized vs per-bar signals (news off and news-gated),
+    fast vs slow backtest trades, the indicator backend vs pandas, and streaming.StreamingSignals
+    vs get_signal_series (news off). True if everything matches.
+    """
+    symbol = config.SYMBOLS[0]
+    variants = {
+        "all indicators": DEFAULT_PARAMS,
+        "volume + OBV only": DEFAULT_PARAMS.with_overrides(
+            USE_RSI=False, USE_MACD=False, USE_ADX=False, USE_MFI=False, USE_STOCHASTIC=False, USE_ZSCORE=False),
+    }
+    ok = True
+    for size in sizes:
+        for seed in seeds:
+            df = synthetic_bars(size, seed)
+            sentiment = synthetic_sentiment(df.index, seed)
+            for label, params in variants.items():
+                for gate in (None, sentiment):
+                    _clear_caches()
+                    mismatches = verify_signals(symbol, df, params, gate)
+                    trades_match = (backtest_symbol(symbol, df, params, fast=True, sentiment=gate)
+                                    == backtest_symbol(symbol, df, params, fast=False, sentiment=gate))
+                    ok = ok and not mismatches and trades_match
+                    status = "OK" if not mismatches else f"{len(mismatches)} mismatched bars (first: {mismatches[0]})"
+                    if not trades_match:
+                        status += ", trades differ"
+                    news_label = "news on" if gate is not None else "news off"
+                    print(f"  {size:>6,} bars  seed {seed}  {label:<18} {news_label:<9} {status}", flush=True)
+            if config.INDICATOR_BACKEND != "pandas":
+                diffs = strategy.verify_backends(df)
+                ok = ok and all(d <= 1e-8 for d in diffs.values())
+                print(f"    {config.INDICATOR_BACKEND} vs pandas: "
+                      + ", ".join(f"{k} max diff {d:.1e}" for k, d in diffs.items()))
+    for seed in seeds:
+        df = synthetic_bars(STREAM_VERIFY_BARS, seed)
+        for label, params in variants.items():
+            mismatches = _streaming_mismatches(df, params)
+            ok = ok and not mismatches
+            status = "OK" if not mismatches else f"{len(mismatches)} mismatched bars (first: {mismatches[0]})"
+            print(f"  {STREAM_VERIFY_BARS:>6,} bars  seed {seed}  {label:<18} streaming {status}", flush=True)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks (synthetic bars, yfinance stubbed)")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Bar / item counts (default 1k-1M; --verify: 300, 800)")
+    parser.add_argument("--filter", help="Only cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds to spend per case and size")
+    parser.add_argument("--out", help="Results file (default bench_results/bench_<commit>_<time>.json)")
+    parser.add_argument("--compare", nargs="+", metavar="JSON",
+                        help="Older results to compare with (two files: compare them without running)")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Ratio above which a case counts as slower")
+    parser.add_argument("--verify", action="store_true",
+                        help="Check vectorized signals and trades match the per-bar path instead of timing")
+    args = parser.parse_args()
+
+    if args.verify:
+        sizes = args.sizes or VERIFY_SIZES
+        print(f"Offline equivalence check at sizes {', '.join(f'{s:,}' for s in sizes)}...")
+        raise SystemExit(0 if verify_offline(sizes) else 1)
+    args.sizes = args.sizes or list(SIZES)
+
+    if args.compare and len(args.compare) == 2:
+        old, new = (json.loads(Path(p).read_text()) for p in args.compare)
+        raise SystemExit(1 if compare(old, new, args.threshold) else 0)
+
+    print(f"Benchmarks (offline) at sizes {', '.join(f'{s:,}' for s in args.sizes)}...")
+    document = run_suite(args.sizes, args.filter, args.min_time)
+    out = Path(args.out) if args.out else RESULTS_DIR / f"bench_{document['commit']}_{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(document, indent=2))
+    print(f"\n  Results: {out}")
+    if args.compare:
+        old = json.loads(Path(args.compare[0]).read_text())
+        raise SystemExit(1 if compare(old, document, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ Trading bot configuration – quant-style futures paper trading.
 Strategy: volume + math + news. Positions are in contracts (futures).
 """
 
+from pathlib import Path
+
 # Futures symbols (Yahoo Finance: MGC=F micro gold, MNQ=F micro Nasdaq, etc.)
 SYMBOLS = ["MGC=F", "MNQ=F"]
 
@@ -101,6 +103,9 @@ ZSCORE_SELL_EXTREME = 2.0  # SELL when |z| > this (take profit or cut loss)
 POSITION_SIZE_PCT = 0.25
 # Max contracts per symbol per trade (risk limit)
 MAX_CONTRACTS_PER_TRADE = 2
+# Portfolio backtest: initial margin per contract as a fraction of notional. New entries are cut
+# so total margin across open positions never exceeds equity.
+MARGIN_PCT_OF_NOTIONAL = 0.10
 
 # --- 1:4 Risk–Reward (math-based exit) ---
 USE_SL_TP = True
@@ -118,13 +123,65 @@ TICK_SIZES = {
 # Fallback when symbol not in SL_TP_TICKS: use ATR-based distance.
 RISK_REWARD_RATIO = 4
 STOP_LOSS_ATR_MULT = 2.0
-
-# How often to check and potentially trade (minutes)
+# Backtest: when one bar touches both SL and TP, which filled first?
+# "stop_first" (conservative), "take_profit_first", or "ohlc" (gaps fill at the open; up bar O->L->H->C,
+# down bar O->H->L->C). Finer bars of INTRABAR_FINE_INTERVAL are used instead when already in the local cache.
+INTRABAR_PATH_MODEL = "stop_first"
+INTRABAR_FINE_INTERVAL = "5m"
+# Monte Carlo (montecarlo.py): resampled trade sequences, and the equity level (fraction of
+# INITIAL_BALANCE) counted as ruin
+MONTE_CARLO_SIMULATIONS = 10_000
+MONTE_CARLO_RUIN_PCT = 0.5
+
+# How often to check and potentially trade (minutes) with daily bars
 CHECK_INTERVAL_MINUTES = 60
 
+# Bar interval: "1d" (daily) or intraday "1m", "5m", "15m", "60m".
+# Indicator periods are in bars. With intraday bars, --loop wakes at each bar close instead of
+# every CHECK_INTERVAL_MINUTES, and signals are evaluated once per new closed bar.
+BAR_INTERVAL = "1d"
+# Seconds to wait after a bar closes before fetching it (lets the data provider publish it)
+BAR_CLOSE_DELAY_SECONDS = 5
+# When a daily futures session closes (CME: 17:00 New York; the bar is labelled with that date).
+# backtest.py --news takes news as of this time for daily bars, so no headline after the fill counts.
+SESSION_TIMEZONE = "America/New_York"
+SESSION_CLOSE_TIME = "17:00"
+# live_async.py: seconds between SL/TP checks of open positions on live prices (between signal cycles)
+SL_TP_MONITOR_SECONDS = 30
+
 # Timeframe for fetching price history
 HISTORY_DAYS = 90
 
+# --- Local price cache (SQLite) ---
+# Bars are stored on disk; each refresh only downloads bars newer than the last stored one.
+USE_PRICE_CACHE = True
+PRICE_CACHE_PATH = Path(__file__).resolve().parent / "cache" / "prices.sqlite"
+# Serve straight from disk (no network) if the symbol was refreshed within this many seconds
+PRICE_CACHE_TTL_SECONDS = 300
+
+# --- Paper account journal ---
+# Fills are appended to this SQLite file each cycle and replayed on startup, so a restart keeps
+# balance, positions and SL/TP. Delete the file to start a fresh account.
+USE_JOURNAL = True
+JOURNAL_PATH = Path(__file__).resolve().parent / "state" / "paper_journal.sqlite"
+# Write a full state snapshot every N fills (startup replays only fills after the latest one)
+JOURNAL_SNAPSHOT_EVERY = 500
+
+# --- Concurrent fetching (live loop) ---
+# Symbols are downloaded in parallel at the start of each cycle
+FETCH_MAX_WORKERS = 8
+# Per-symbol download timeout (seconds); a symbol that times out is skipped for the cycle
+FETCH_TIMEOUT_SECONDS = 15
+
+# --- Indicator cache (live loop) ---
+# Signal frames kept per (symbol, params); least recently used evicted beyond this. 0 = off
+INDICATOR_CACHE_SIZE = 128
+# When new bars arrive, indicators are recomputed on only this many trailing bars (warm-up for EMAs)
+INDICATOR_CACHE_WARMUP_BARS = 300
+# ADX/MFI implementation: "numpy" (vectorized arrays), "numba" (jitted, needs `pip install numba`;
+# falls back to numpy) or "pandas" (original reference version)
+INDICATOR_BACKEND = "numpy"
+
 # --- News ---
 USE_NEWS = True
 # How many recent news items to consider for sentiment
@@ -133,3 +190,13 @@ NEWS_LOOKBACK_ITEMS = 10
 NEWS_SENTIMENT_BUY_MIN = -0.3
 # SELL more likely when news sentiment <= this (strong negative)
 NEWS_SENTIMENT_SELL_MAX = -0.5
+# Sentiment per symbol is reused for this many seconds before news is fetched again
+NEWS_CACHE_TTL_SECONDS = 900
+# After the TTL, the old sentiment is still served for up to this many seconds while a background
+# refresh runs (stale-while-revalidate); older than TTL + this, the next request fetches inline
+NEWS_STALE_SECONDS = 3600
+# Keep every fetched headline in a local store (news_store.py) so backtests can replay the news gate
+USE_NEWS_STORE = True
+NEWS_STORE_PATH = Path(__file__).resolve().parent / "cache" / "news.sqlite"
+# Backtest news gate: headlines older than this many days no longer count toward sentiment
+NEWS_STORE_MAX_AGE_DAYS = 7
@@ -1,22 +1,168 @@
-"""Fetch market data using Yahoo Finance."""
+"""Fetch market data using Yahoo Finance, backed by a local on-disk bar cache."""
 
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from dataclasses import dataclass, field
 import yfinance as yf
 import pandas as pd
-from config import SYMBOLS, HISTORY_DAYS
+import price_cache
+from volatility import atr_from_df, atr_ratio_from_df
+from config import (
+    SYMBOLS,
+    HISTORY_DAYS,
+    BAR_INTERVAL,
+    USE_PRICE_CACHE,
+    PRICE_CACHE_TTL_SECONDS,
+    FETCH_MAX_WORKERS,
+    FETCH_TIMEOUT_SECONDS,
+)
 
+DAILY = "1d"
+# Bar length per supported interval
+INTERVAL_SECONDS = {"1m": 60, "5m": 300, "15m": 900, "60m": 3600, DAILY: 86400}
+# Longest history Yahoo serves for intraday intervals (days); longer requests are clamped
+MAX_HISTORY_DAYS = {"1m": 7, "5m": 60, "15m": 60, "60m": 730}
 
-def get_prices(symbol: str, days: int = HISTORY_DAYS) -> pd.DataFrame | None:
-    """Get historical OHLCV data for a symbol."""
+
+def _download(
+    symbol: str,
+    days: int | None = None,
+    start: pd.Timestamp | None = None,
+    timeout: float | None = None,
+    interval: str = DAILY,
+) -> pd.DataFrame | None:
+    """Download bars from Yahoo: the last `days` days, or everything from `start`."""
     try:
         ticker = yf.Ticker(symbol)
-        df = ticker.history(period=f"{days}d")
-        if df.empty or len(df) < 2:
+        kwargs = {"timeout": timeout} if timeout is not None else {}
+        if start is not None:
+            df = ticker.history(start=start, interval=interval, **kwargs)
+        else:
+            df = ticker.history(period=f"{days}d", interval=interval, **kwargs)
+        if df is None or df.empty:
+            return None
+        return df
+    except Exception:
+        return None
+
+
+def _window_start(days: int) -> pd.Timestamp:
+    """Start of a `days`-day history window (same span as yfinance period=f"{days}d")."""
+    return (pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=days)).normalize()
+
+
+def _cache_stale(refreshed_at: float, interval: str) -> bool:
+    """Older than PRICE_CACHE_TTL_SECONDS, or (intraday) refreshed before the latest bar closed."""
+    now = time.time()
+    if now - refreshed_at > PRICE_CACHE_TTL_SECONDS:
+        return True
+    step = INTERVAL_SECONDS.get(interval, 0)
+    return interval != DAILY and step > 0 and refreshed_at < now - (now % step)
+
+
+def _cached_prices(
+    symbol: str,
+    days: int,
+    timeout: float | None = None,
+    interval: str = DAILY,
+) -> pd.DataFrame | None:
+    """
+    Serve the window from the local cache, downloading only what is missing:
+    the whole window if the cache doesn't reach back far enough, otherwise only bars
+    from the last stored one onward (and nothing at all within PRICE_CACHE_TTL_SECONDS).
+    """
+    start = _window_start(days)
+    meta = price_cache.get_meta(symbol, interval)
+    covered = meta is not None and meta["covered_from"] is not None and meta["covered_from"] <= start.timestamp()
+    if not covered:
+        df = _download(symbol, days=days, timeout=timeout, interval=interval)
+        if df is not None:
+            price_cache.store_bars(symbol, interval, df, covered_from=start)
+    elif _cache_stale(meta["refreshed_at"], interval):
+        since = price_cache.last_timestamp(symbol, interval) or start
+        df = _download(symbol, start=since, timeout=timeout, interval=interval)
+        if df is not None:
+            price_cache.store_bars(symbol, interval, df)
+    # Network failures fall through to whatever is on disk (offline mode)
+    return price_cache.load_bars(symbol, interval, start=start)
+
+
+def get_prices(
+    symbol: str,
+    days: int = HISTORY_DAYS,
+    timeout: float | None = None,
+    interval: str = BAR_INTERVAL,
+) -> pd.DataFrame | None:
+    """
+    Get historical OHLCV bars for a symbol at interval (1m/5m/15m/60m/1d).
+    Intraday history is clamped to what Yahoo serves. timeout (seconds) bounds each download.
+    """
+    days = min(days, MAX_HISTORY_DAYS.get(interval, days))
+    try:
+        if USE_PRICE_CACHE:
+            df = _cached_prices(symbol, days, timeout, interval)
+        else:
+            df = _download(symbol, days=days, timeout=timeout, interval=interval)
+        if df is None or df.empty or len(df) < 2:
             return None
         return df
     except Exception:
         return None
 
 
+def fetch_all(
+    symbols: list[str],
+    days: int = HISTORY_DAYS,
+    max_workers: int = FETCH_MAX_WORKERS,
+    timeout: float = FETCH_TIMEOUT_SECONDS,
+    interval: str = BAR_INTERVAL,
+) -> dict[str, pd.DataFrame | None]:
+    """
+    get_prices for many symbols at once on a thread pool of max_workers.
+    Each download is bounded by timeout; a symbol that fails or is still running when the
+    pool's overall deadline passes maps to None, so one slow ticker never stalls the others.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    results: dict[str, pd.DataFrame | None] = {}
+    if not symbols:
+        return results
+    workers = max(1, min(max_workers, len(symbols)))
+    deadline = timeout * math.ceil(len(symbols) / workers) + 1.0
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch")
+    futures = {pool.submit(get_prices, symbol, days, timeout, interval): symbol for symbol in symbols}
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            results[futures[future]] = future.result()
+    except FuturesTimeoutError:
+        pass
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    for symbol in symbols:
+        results.setdefault(symbol, None)
+    return results
+
+
+def closed_bars(df: pd.DataFrame | None, interval: str = BAR_INTERVAL, now: pd.Timestamp | None = None):
+    """
+    df without its still-forming last bar, for intraday intervals (a bar is closed once
+    its start + interval has passed). Daily bars are returned unchanged, as before.
+    """
+    if df is None or df.empty or interval == DAILY:
+        return df
+    now = now if now is not None else pd.Timestamp.now(tz="UTC")
+    if df.index[-1] + pd.Timedelta(seconds=INTERVAL_SECONDS[interval]) > now:
+        return df.iloc[:-1]
+    return df
+
+
+def seconds_until_bar_close(interval: str = BAR_INTERVAL, now: float | None = None) -> float:
+    """Seconds from now (epoch seconds) until the next close of an interval bar (UTC-aligned)."""
+    step = INTERVAL_SECONDS[interval]
+    now = time.time() if now is None else now
+    return step - (now % step)
+
+
 def get_latest_price(symbol: str) -> float | None:
     """Get the latest close price for a symbol."""
     df = get_prices(symbol, days=5)
@@ -25,28 +171,20 @@ def get_latest_price(symbol: str) -> float | None:
     return float(df["Close"].iloc[-1])
 
 
+def get_live_price(symbol: str, timeout: float | None = None) -> float | None:
+    """Last traded price from today's 1-minute bars, bypassing the price cache (for SL/TP monitoring)."""
+    df = _download(symbol, days=1, timeout=timeout, interval="1m")
+    if df is None or df.empty:
+        return None
+    return float(df["Close"].iloc[-1])
+
+
 def get_atr(symbol: str, period: int = 14) -> float | None:
     """
     Current ATR (Average True Range) in price units.
     Used for stop loss / take profit distance (math-based risk).
     """
-    df = get_prices(symbol, days=period + 20)
-    if df is None or len(df) < period + 2:
-        return None
-    high = df["High"]
-    low = df["Low"]
-    close = df["Close"]
-    prev_close = close.shift(1)
-    tr = pd.concat([
-        high - low,
-        (high - prev_close).abs(),
-        (low - prev_close).abs(),
-    ], axis=1).max(axis=1)
-    atr = tr.rolling(period).mean()
-    val = atr.iloc[-1]
-    if pd.isna(val) or val <= 0:
-        return None
-    return float(val)
+    return atr_from_df(get_prices(symbol, days=period + 20), period)
 
 
 def get_atr_ratio(symbol: str, period: int = 14, ma_days: int = 20) -> float | None:
@@ -55,21 +193,139 @@ def get_atr_ratio(symbol: str, period: int = 14, ma_days: int = 20) -> float | N
     Returns (ATR_ma / ATR_current) so high vol -> smaller ratio -> smaller position.
     None if not enough data.
     """
-    df = get_prices(symbol, days=max(period, ma_days) + 10)
-    if df is None or len(df) < period + ma_days:
-        return None
-    high = df["High"]
-    low = df["Low"]
-    close = df["Close"]
-    prev_close = close.shift(1)
-    tr = pd.concat([
-        high - low,
-        (high - prev_close).abs(),
-        (low - prev_close).abs(),
-    ], axis=1).max(axis=1)
-    atr = tr.rolling(period).mean()
-    atr_current = atr.iloc[-1]
-    atr_ma = atr.rolling(ma_days).mean().iloc[-1]
-    if pd.isna(atr_current) or pd.isna(atr_ma) or atr_current <= 0:
-        return None
-    return float(atr_ma / atr_current)
+    return atr_ratio_from_df(get_prices(symbol, days=max(period, ma_days) + 10), period, ma_days)
+
+
+@dataclass(frozen=True, slots=True)
+class Quote:
+    """Latest price and volatility of one symbol, computed once per cycle."""
+
+    price: float
+    atr: float | None = None
+    atr_ratio: float | None = None
+    sl_tp: tuple[float, float] | None = None  # (stop, target) distances for a long entered now
+
+
+@dataclass
+class MarketContext:
+    """
+    In-memory market data for order decisions: symbol -> Quote for one ATR period / MA length.
+    Lookups never download; symbols not in the context read as None.
+    """
+
+    quotes: dict[str, Quote] = field(default_factory=dict)
+    atr_period: int = 14
+    atr_ma_days: int = 20
+    params: object | None = None  # StrategyParams the SL/TP distances were computed with
+
+    def _check(self, period: int, ma_days: int | None = None) -> None:
+        if period != self.atr_period or (ma_days is not None and ma_days != self.atr_ma_days):
+            raise ValueError(
+                f"MarketContext holds ATR({self.atr_period}) / MA {self.atr_ma_days}, asked for ATR({period})"
+                + (f" / MA {ma_days}" if ma_days is not None else "")
+            )
+
+    def latest_price(self, symbol: str) -> float | None:
+        quote = self.quotes.get(symbol)
+        return None if quote is None else quote.price
+
+    def atr(self, symbol: str, period: int = 14) -> float | None:
+        self._check(period)
+        quote = self.quotes.get(symbol)
+        return None if quote is None else quote.atr
+
+    def atr_ratio(self, symbol: str, period: int = 14, ma_days: int = 20) -> float | None:
+        self._check(period, ma_days)
+        quote = self.quotes.get(symbol)
+        return None if quote is None else quote.atr_ratio
+
+    def sl_tp(self, symbol: str, params) -> tuple[float, float] | None:
+        """
+        (stop, target) distances for a long entered now (last row of params.sl_tp_distances).
+        A context built without params derives them from params: fixed (ticks) or the quote's ATR.
+        """
+        if self.params is not None and params != self.params:
+            raise ValueError("MarketContext SL/TP distances were built for different strategy params")
+        quote = self.quotes.get(symbol)
+        if quote is None:
+            return None
+        if self.params is not None:
+            return quote.sl_tp
+        if params.ticks_for(symbol) is not None:
+            return params.fixed_sl_tp(symbol)
+        self._check(params.atr_period)
+        if quote.atr is None or quote.atr <= 0:
+            return params.fixed_sl_tp(symbol)
+        risk = params.stop_loss_atr_mult * quote.atr
+        return risk, params.risk_reward_ratio * risk
+
+
+@dataclass
+class MarketSnapshot:
+    """
+    Price history for one trading cycle. Each symbol is downloaded at most once
+    (HISTORY_DAYS of bars) and shared by strategy, sizing and P&L for the rest of the cycle.
+    """
+
+    days: int = HISTORY_DAYS
+    interval: str = BAR_INTERVAL
+    frames: dict[str, pd.DataFrame | None] = field(default_factory=dict)  # symbol -> bars (None = no data)
+    news: dict[str, float | None] = field(default_factory=dict)  # symbol -> prefetched news sentiment
+
+    def prefetch(self, symbols: list[str]) -> None:
+        """Download every symbol not yet in the snapshot concurrently (see fetch_all)."""
+        missing = [symbol for symbol in symbols if symbol not in self.frames]
+        self.frames.update(fetch_all(missing, days=self.days, interval=self.interval))
+
+    def prices(self, symbol: str) -> pd.DataFrame | None:
+        if symbol not in self.frames:
+            self.frames[symbol] = get_prices(symbol, days=self.days, interval=self.interval)
+        return self.frames[symbol]
+
+    def closed_prices(self, symbol: str) -> pd.DataFrame | None:
+        """Bars for signals: prices() without the still-forming intraday bar."""
+        return closed_bars(self.prices(symbol), self.interval)
+
+    def latest_price(self, symbol: str) -> float | None:
+        df = self.prices(symbol)
+        if df is None or df.empty:
+            return None
+        return float(df["Close"].iloc[-1])
+
+    def atr(self, symbol: str, period: int = 14) -> float | None:
+        return atr_from_df(self.prices(symbol), period)
+
+    def atr_ratio(self, symbol: str, period: int = 14, ma_days: int = 20) -> float | None:
+        return atr_ratio_from_df(self.prices(symbol), period, ma_days)
+
+    def sl_tp(self, symbol: str, params) -> tuple[float, float] | None:
+        """(stop, target) distances for a long entered at the last bar (see StrategyParams.sl_tp_distances)."""
+        df = self.prices(symbol)
+        if df is None or df.empty:
+            return None
+        risk, reward = params.sl_tp_distances(symbol, df).iloc[-1]
+        return float(risk), float(reward)
+
+    def context(
+        self,
+        symbols: list[str] | None = None,
+        atr_period: int = 14,
+        ma_days: int = 20,
+        params=None,
+    ) -> MarketContext:
+        """
+        Quotes for symbols (default: all fetched) from the bars already in the snapshot; never downloads.
+        With params (StrategyParams), quotes also carry the SL/TP distances for an entry at the last bar.
+        """
+        quotes = {}
+        for symbol in symbols if symbols is not None else list(self.frames):
+            df = self.frames.get(symbol)
+            if df is None or df.empty:
+                continue
+            quotes[symbol] = Quote(
+                price=float(df["Close"].iloc[-1]),
+                atr=atr_from_df(df, atr_period),
+                atr_ratio=atr_ratio_from_df(df, atr_period, ma_days),
+                sl_tp=self.sl_tp(symbol, params) if params is not None else None,
+            )
+        return MarketContext(quotes, atr_period, ma_days, params)
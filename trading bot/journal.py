@@ -0,0 +1,65 @@
+"""
+Append-only journal of paper-trading fills (SQLite, WAL) so --loop survives restarts.
+Each event stores the symbol's position, entry, SL/TP and the balance after the fill, so replay is
+plain assignment. A full state snapshot is written every JOURNAL_SNAPSHOT_EVERY events; startup
+loads the latest snapshot and replays only the events after it.
+"""
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from config import JOURNAL_PATH, JOURNAL_SNAPSHOT_EVERY
+
+# (ts, kind, symbol, contracts, price, position, entry, sl, tp, balance); position/entry/sl/tp are after the fill
+EVENT_COLUMNS = ("ts", "kind", "symbol", "contracts", "price", "position", "entry", "sl", "tp", "balance")
+
+
+@contextmanager
+def _connect(path=JOURNAL_PATH):
+    """Open the journal (creating tables on first use); one transaction, fsync'd on commit."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=FULL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS events ("
+        " seq INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL, kind TEXT, symbol TEXT, contracts INTEGER,"
+        " price REAL, position INTEGER, entry REAL, sl REAL, tp REAL, balance REAL)"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS snapshots (seq INTEGER PRIMARY KEY, state TEXT)")
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def append(events: list[tuple], state: dict, path=JOURNAL_PATH) -> None:
+    """
+    Write a cycle's events in one transaction (one fsync). state is the trader state after them;
+    it is stored as a snapshot once JOURNAL_SNAPSHOT_EVERY events have accumulated since the last one.
+    """
+    if not events:
+        return
+    with _connect(path) as conn:
+        conn.executemany(
+            f"INSERT INTO events ({', '.join(EVENT_COLUMNS)}) VALUES ({', '.join('?' * len(EVENT_COLUMNS))})",
+            events,
+        )
+        last_seq = conn.execute("SELECT MAX(seq) FROM events").fetchone()[0]
+        snap_seq = conn.execute("SELECT MAX(seq) FROM snapshots").fetchone()[0] or 0
+        if last_seq - snap_seq >= JOURNAL_SNAPSHOT_EVERY:
+            conn.execute("INSERT INTO snapshots VALUES (?, ?)", (last_seq, json.dumps(state)))
+
+
+def load(path=JOURNAL_PATH) -> tuple[dict | None, list[tuple]]:
+    """Latest snapshot state (None if none yet) and the events recorded after it, oldest first."""
+    if not path.exists():
+        return None, []
+    with _connect(path) as conn:
+        row = conn.execute("SELECT seq, state FROM snapshots ORDER BY seq DESC LIMIT 1").fetchone()
+        seq, state = (row[0], json.loads(row[1])) if row is not None else (0, None)
+        events = conn.execute(
+            f"SELECT {', '.join(EVENT_COLUMNS)} FROM events WHERE seq > ? ORDER BY seq", (seq,)
+        ).fetchall()
+    return state, events
@@ -0,0 +1,166 @@
+"""
+Array kernels for the heaviest indicators (ADX, MFI) on float64 NumPy arrays.
+Same definitions as the pandas versions in strategy.py (_adx_pandas, _mfi_pandas): a rolling mean
+needs a full window of non-NaN values, and a zero denominator gives NaN (MFI then reads 50).
+Backends: "numpy" (vectorized) or "numba" (jitted loops; falls back to numpy if numba is not installed).
+Checked against the pandas versions by strategy.verify_backends / python backtest.py --verify.
+"""
+
+import numpy as np
+from volatility import true_range_array
+
+try:
+    import numba
+except ImportError:  # optional: pip install numba
+    numba = None
+
+
+def _shift(x: np.ndarray) -> np.ndarray:
+    """x shifted one bar later (NaN first), like Series.shift(1)."""
+    out = np.empty_like(x)
+    out[:1] = np.nan
+    out[1:] = x[:-1]
+    return out
+
+
+def _rolling_mean(x: np.ndarray, period: int) -> np.ndarray:
+    """Series.rolling(period).mean(): NaN until period bars, and for any window containing NaN."""
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        # period shifted adds: exact zeros stay zero (no cumsum drift) and NaN poisons its windows
+        total = x[period - 1:].copy()
+        for k in range(1, period):
+            total += x[period - 1 - k: len(x) - k]
+        out[period - 1:] = total / period
+    return out
+
+
+def _directional_movement(high: np.ndarray, low: np.ndarray, close: np.ndarray):
+    """+DM, −DM (only the larger positive move counts) and true range per bar."""
+    up = high - _shift(high)
+    down = _shift(low) - low
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > plus_dm) & (down > 0), down, 0.0)
+    return plus_dm, minus_dm, true_range_array(high, low, close)
+
+
+def adx_numpy(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """Average Directional Index (0–100) for every bar."""
+    plus_dm, minus_dm, tr = _directional_movement(high, low, close)
+    atr = _rolling_mean(tr, period)
+    atr[atr == 0] = np.nan
+    plus_di = 100 * _rolling_mean(plus_dm, period) / atr
+    minus_di = 100 * _rolling_mean(minus_dm, period) / atr
+    di_sum = plus_di + minus_di
+    di_sum[di_sum == 0] = np.nan
+    dx = 100 * np.abs(plus_di - minus_di) / di_sum
+    return _rolling_mean(dx, period)
+
+
+def mfi_numpy(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray, period: int) -> np.ndarray:
+    """Money Flow Index (0–100) for every bar; 50 where undefined."""
+    typical = (high + low + close) / 3
+    flow = typical * volume
+    prev = _shift(typical)
+    pos = _rolling_mean(np.where(typical > prev, flow, 0.0), period)
+    neg = _rolling_mean(np.where(typical < prev, flow, 0.0), period)
+    neg[neg == 0] = np.nan
+    mfi = 100 - 100 / (1 + pos / neg)
+    mfi[np.isnan(mfi)] = 50.0
+    return mfi
+
+
+def _window_mean_loop(x, period, out):
+    """Rolling mean over full windows; NaN if the window has a NaN (plain loop for numba)."""
+    for i in range(len(x)):
+        if i < period - 1:
+            out[i] = np.nan
+            continue
+        total = 0.0
+        for j in range(i - period + 1, i + 1):
+            total += x[j]
+        out[i] = total / period
+
+
+def _adx_loop(high, low, close, period):
+    n = len(close)
+    plus_dm = np.zeros(n)
+    minus_dm = np.zeros(n)
+    tr = np.empty(n)
+    tr[0] = high[0] - low[0]
+    for i in range(1, n):
+        up = high[i] - high[i - 1]
+        down = low[i - 1] - low[i]
+        if up > down and up > 0:
+            plus_dm[i] = up
+        if down > plus_dm[i] and down > 0:
+            minus_dm[i] = down
+        tr[i] = max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+    atr = np.empty(n)
+    plus_avg = np.empty(n)
+    minus_avg = np.empty(n)
+    _window_mean_loop(tr, period, atr)
+    _window_mean_loop(plus_dm, period, plus_avg)
+    _window_mean_loop(minus_dm, period, minus_avg)
+    dx = np.empty(n)
+    for i in range(n):
+        dx[i] = np.nan
+        if atr[i] == 0 or np.isnan(atr[i]):
+            continue
+        plus_di = 100 * plus_avg[i] / atr[i]
+        minus_di = 100 * minus_avg[i] / atr[i]
+        if plus_di + minus_di != 0:
+            dx[i] = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
+    adx = np.empty(n)
+    _window_mean_loop(dx, period, adx)
+    return adx
+
+
+def _mfi_loop(high, low, close, volume, period):
+    n = len(close)
+    pos = np.zeros(n)
+    neg = np.zeros(n)
+    prev = np.nan
+    for i in range(n):
+        typical = (high[i] + low[i] + close[i]) / 3
+        if typical > prev:
+            pos[i] = typical * volume[i]
+        elif typical < prev:
+            neg[i] = typical * volume[i]
+        prev = typical
+    pos_avg = np.empty(n)
+    neg_avg = np.empty(n)
+    _window_mean_loop(pos, period, pos_avg)
+    _window_mean_loop(neg, period, neg_avg)
+    mfi = np.empty(n)
+    for i in range(n):
+        mfi[i] = 50.0
+        if neg_avg[i] != 0 and not np.isnan(neg_avg[i]) and not np.isnan(pos_avg[i]):
+            mfi[i] = 100 - 100 / (1 + pos_avg[i] / neg_avg[i])
+    return mfi
+
+
+if numba is not None:
+    _window_mean_loop = numba.njit(cache=True)(_window_mean_loop)
+    _adx_loop = numba.njit(cache=True)(_adx_loop)
+    _mfi_loop = numba.njit(cache=True)(_mfi_loop)
+
+
+def _floats(*arrays) -> list[np.ndarray]:
+    return [np.ascontiguousarray(a, dtype=np.float64) for a in arrays]
+
+
+def adx(high, low, close, period: int, backend: str = "numpy") -> np.ndarray:
+    """ADX with the given array backend ("numpy" or "numba")."""
+    high, low, close = _floats(high, low, close)
+    if backend == "numba" and numba is not None:
+        return _adx_loop(high, low, close, period)
+    return adx_numpy(high, low, close, period)
+
+
+def mfi(high, low, close, volume, period: int, backend: str = "numpy") -> np.ndarray:
+    """MFI with the given array backend ("numpy" or "numba")."""
+    high, low, close, volume = _floats(high, low, close, volume)
+    if backend == "numba" and numba is not None:
+        return _mfi_loop(high, low, close, volume, period)
+    return mfi_numpy(high, low, close, volume, period)
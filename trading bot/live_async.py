@@ -0,0 +1,135 @@
+"""
+Asyncio live loop: the same cycle as main.py --loop, with
+- prices and news for all symbols fetched concurrently, each bounded by FETCH_TIMEOUT_SECONDS,
+- signal cycles scheduled on wall-clock boundaries (each bar close for intraday bars, every
+  CHECK_INTERVAL_MINUTES otherwise), so slow cycles don't make the schedule drift,
+- SL/TP of open positions checked every SL_TP_MONITOR_SECONDS on live prices between cycles.
+
+Run: python live_async.py
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from config import (
+    SYMBOLS,
+    BAR_INTERVAL,
+    BAR_CLOSE_DELAY_SECONDS,
+    CHECK_INTERVAL_MINUTES,
+    HISTORY_DAYS,
+    FETCH_MAX_WORKERS,
+    FETCH_TIMEOUT_SECONDS,
+    SL_TP_MONITOR_SECONDS,
+    USE_JOURNAL,
+    USE_NEWS,
+)
+from data import MarketSnapshot, DAILY, INTERVAL_SECONDS, get_prices, get_live_price
+from news import get_news_sentiment
+from paper_trader import PaperTrader
+from main import run_once, check_sl_tp
+
+
+async def _gather_bounded(pool: ThreadPoolExecutor, func, symbols: list[str], *args) -> dict:
+    """func(symbol, *args) for every symbol on pool, whose max_workers bounds the worker threads.
+    A call that fails or exceeds FETCH_TIMEOUT_SECONDS maps to None; a hung call keeps only its own
+    pool thread, never the loop's default executor."""
+    loop = asyncio.get_running_loop()
+
+    async def one(symbol: str):
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(pool, partial(func, symbol, *args)), FETCH_TIMEOUT_SECONDS
+            )
+        except Exception:  # timeout or download error: skip the symbol this cycle
+            return None
+
+    symbols = list(dict.fromkeys(symbols))
+    results = await asyncio.gather(*(one(symbol) for symbol in symbols))
+    return dict(zip(symbols, results))
+
+
+def seconds_until_boundary(period: float, offset: float = 0.0, now: float | None = None) -> float:
+    """Seconds until the next wall-clock multiple of period (epoch-aligned), plus offset."""
+    now = time.time() if now is None else now
+    return period - ((now - offset) % period)
+
+
+class AsyncTrader:
+    """Drives one PaperTrader from two schedules: signal cycles and the faster SL/TP monitor."""
+
+    def __init__(self, trader: PaperTrader):
+        self.trader = trader
+        self.intraday = BAR_INTERVAL != DAILY
+        self.last_bars: dict | None = {} if self.intraday else None
+        self.pool = ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS, thread_name_prefix="fetch")
+
+    async def signal_cycle(self) -> None:
+        """Fetch prices and news concurrently, then run the usual cycle on the in-memory snapshot."""
+        symbols = list(SYMBOLS) + [s for s in self.trader.positions if s not in SYMBOLS]
+        frames, news = await asyncio.gather(
+            _gather_bounded(self.pool, get_prices, symbols, HISTORY_DAYS, FETCH_TIMEOUT_SECONDS, BAR_INTERVAL),
+            _gather_bounded(self.pool, get_news_sentiment, list(SYMBOLS) if USE_NEWS else []),
+        )
+        snapshot = MarketSnapshot(frames=frames, news=news)
+        # run_once is synchronous CPU work on the loop thread, so it never interleaves with the monitor
+        run_once(self.trader, snapshot, self.last_bars)
+        if USE_JOURNAL:
+            self.trader.save()
+        print(f"  Equity: ${self.trader.total_value(snapshot):,.2f}  |  Cash (realized): ${self.trader.cash():,.2f}")
+
+    async def monitor_cycle(self) -> None:
+        """Check SL/TP of open positions against live prices."""
+        if not self.trader.positions:
+            return
+        prices = await _gather_bounded(self.pool, get_live_price, list(self.trader.positions), FETCH_TIMEOUT_SECONDS)
+        closed = False
+        for symbol, price in prices.items():
+            if price is not None:
+                closed = check_sl_tp(self.trader, symbol, price) or closed
+        if closed and USE_JOURNAL:
+            self.trader.save()
+
+    def seconds_until_signal(self) -> float:
+        if self.intraday:
+            return seconds_until_boundary(INTERVAL_SECONDS[BAR_INTERVAL], BAR_CLOSE_DELAY_SECONDS)
+        return seconds_until_boundary(CHECK_INTERVAL_MINUTES * 60)
+
+    async def _every(self, name: str, job, wait) -> None:
+        """Run job, then sleep until the next boundary; errors are reported and the schedule continues."""
+        while True:
+            try:
+                await job()
+            except Exception as e:
+                print(f"  [{name}] cycle failed: {e!r}")
+            await asyncio.sleep(wait())
+
+    async def run(self) -> None:
+        async def signals():
+            print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] Checking...")
+            await self.signal_cycle()
+
+        try:
+            await asyncio.gather(
+                self._every("signals", signals, self.seconds_until_signal),
+                self._every("sl/tp", self.monitor_cycle, lambda: seconds_until_boundary(SL_TP_MONITOR_SECONDS)),
+            )
+        finally:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    trader = PaperTrader.load() if USE_JOURNAL else PaperTrader()
+    print(f"Futures paper trading (asyncio). Equity: ${trader.balance:,.2f}  |  Symbols: {', '.join(SYMBOLS)}")
+    cadence = f"each {BAR_INTERVAL} bar close" if BAR_INTERVAL != DAILY else f"every {CHECK_INTERVAL_MINUTES} min"
+    print(f"Signals: {cadence}  |  SL/TP monitor: every {SL_TP_MONITOR_SECONDS}s")
+    try:
+        asyncio.run(AsyncTrader(trader).run())
+    except KeyboardInterrupt:
+        if USE_JOURNAL:
+            trader.save()
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,34 +5,88 @@ Positions are in contracts (futures). P&L = (exit - entry) × multiplier.
 Run once:
   python main.py
 
-Run continuously (check every N minutes):
+Run continuously (daily bars: check every N minutes; intraday bars: at each bar close):
   python main.py --loop
+
+With USE_JOURNAL, fills are journaled each cycle and the account is restored on startup.
 """
 
 import argparse
 import time
-from config import SYMBOLS, INITIAL_BALANCE, CHECK_INTERVAL_MINUTES
-from data import get_latest_price
+from config import (
+    SYMBOLS, INITIAL_BALANCE, CHECK_INTERVAL_MINUTES, BAR_INTERVAL, BAR_CLOSE_DELAY_SECONDS, USE_JOURNAL,
+)
+from data import MarketSnapshot, DAILY, seconds_until_bar_close
+from news import prefetch_news
 from strategy import get_signals
 from paper_trader import PaperTrader
 
 
-def run_once(trader: PaperTrader) -> None:
-    """Execute trades from math-based signals; exit by 1:4 SL/TP or SELL signal."""
+def _is_new_bar(symbol: str, snapshot: MarketSnapshot, last_bars: dict | None) -> bool:
+    """True if symbol has a closed bar not evaluated yet (records it). Always True without last_bars."""
+    if last_bars is None:
+        return True
+    df = snapshot.closed_prices(symbol)
+    if df is None or df.empty:
+        return False
+    bar = df.index[-1]
+    if last_bars.get(symbol) == bar:
+        return False
+    last_bars[symbol] = bar
+    return True
+
+
+def check_sl_tp(trader: PaperTrader, symbol: str, price: float) -> bool:
+    """Close the position in symbol if price hit its stop loss or take profit. True if closed."""
+    position = trader.position(symbol)
+    if position <= 0:
+        return False
+    if trader.should_stop_loss(symbol, price):
+        if trader.sell(symbol, position, price):
+            print(f"  [PAPER] SELL {position} contract(s) {symbol} @ {price:.2f}  [STOP LOSS]")
+            return True
+    elif trader.should_take_profit(symbol, price):
+        if trader.sell(symbol, position, price):
+            print(f"  [PAPER] SELL {position} contract(s) {symbol} @ {price:.2f}  [TAKE PROFIT 1:4]")
+            return True
+    return False
+
+
+def run_once(
+    trader: PaperTrader,
+    snapshot: MarketSnapshot | None = None,
+    last_bars: dict | None = None,
+) -> MarketSnapshot:
+    """
+    Execute trades from math-based signals; exit by 1:4 SL/TP or SELL signal.
+    Each symbol is downloaded once per cycle (snapshot); returns it for the equity printout.
+    With last_bars (symbol -> last evaluated bar time), signals run only on new closed bars;
+    SL/TP is still checked every call.
+    """
+    if snapshot is None:
+        snapshot = MarketSnapshot()
+    # All traded symbols plus any open positions (for equity), fetched concurrently up front;
+    # prices and ATR for order decisions are then read from memory
+    symbols = list(SYMBOLS) + [s for s in trader.positions if s not in SYMBOLS]
+    snapshot.prefetch(symbols)
+    # News sentiment once per cycle (cached across cycles), so signals never wait on a news fetch
+    snapshot.news.update(prefetch_news([s for s in SYMBOLS if s not in snapshot.news]))
+    market = snapshot.context(symbols, atr_period=trader.params.atr_period, params=trader.params)
     for symbol in SYMBOLS:
-        price = get_latest_price(symbol)
+        price = snapshot.latest_price(symbol)
         if price is None:
             print(f"  [{symbol}] No price data, skipping.")
             continue
 
         position = trader.position(symbol)
+        new_bar = _is_new_bar(symbol, snapshot, last_bars)
 
         # Open: only when math-based strategy says BUY
         if position == 0:
-            signal = get_signals(symbol)
+            signal = get_signals(symbol, snapshot, trader.params) if new_bar else "HOLD"
             if signal == "BUY":
-                contracts = trader.contracts_to_buy(symbol, price)
-                if contracts >= 1 and trader.buy(symbol, contracts, price):
+                contracts = trader.contracts_to_buy(symbol, price, market)
+                if contracts >= 1 and trader.buy(symbol, contracts, price, market):
                     entry = trader.entry_prices.get(symbol, price)
                     sl = trader.sl_prices.get(symbol)
                     tp = trader.tp_prices.get(symbol)
@@ -40,39 +94,48 @@ def run_once(trader: PaperTrader) -> None:
             continue
 
         # Close: 1) SL/TP (math-based 1:4) first, then 2) strategy SELL
-        if trader.should_stop_loss(symbol, price):
-            if trader.sell(symbol, position, price):
-                print(f"  [PAPER] SELL {position} contract(s) {symbol} @ {price:.2f}  [STOP LOSS]")
-        elif trader.should_take_profit(symbol, price):
-            if trader.sell(symbol, position, price):
-                print(f"  [PAPER] SELL {position} contract(s) {symbol} @ {price:.2f}  [TAKE PROFIT 1:4]")
-        else:
-            signal = get_signals(symbol)
+        if check_sl_tp(trader, symbol, price):
+            continue
+        if new_bar:
+            signal = get_signals(symbol, snapshot, trader.params)
             if signal == "SELL" and trader.sell(symbol, position, price):
                 print(f"  [PAPER] SELL {position} contract(s) {symbol} @ {price:.2f}  [SIGNAL]")
+    return snapshot
 
 
 def main():
     parser = argparse.ArgumentParser(description="Quant futures paper trading (volume + math + news)")
-    parser.add_argument("--loop", action="store_true", help="Run continuously every N minutes")
+    parser.add_argument("--loop", action="store_true", help="Run continuously (every N minutes or each bar close)")
     args = parser.parse_args()
 
-    trader = PaperTrader()
+    trader = PaperTrader.load() if USE_JOURNAL else PaperTrader()
+    if trader.positions or trader.balance != INITIAL_BALANCE:
+        print(f"Restored paper account: cash ${trader.balance:,.2f}, positions {trader.positions or 'none'}")
     print(f"Futures paper trading started. Starting equity: ${trader.balance:,.2f}")
-    print(f"Symbols (contracts): {', '.join(SYMBOLS)}")
+    print(f"Symbols (contracts): {', '.join(SYMBOLS)}  |  Bars: {BAR_INTERVAL}")
     print("-" * 50)
 
     if args.loop:
         interval_sec = CHECK_INTERVAL_MINUTES * 60
+        intraday = BAR_INTERVAL != DAILY
+        last_bars = {} if intraday else None
         while True:
             print(f"\n[{time.strftime('%Y-%m-%d %H:%M')}] Checking...")
-            run_once(trader)
-            total = trader.total_value()
+            snapshot = run_once(trader, last_bars=last_bars)
+            if USE_JOURNAL:
+                trader.save()
+            total = trader.total_value(snapshot)
             print(f"  Equity: ${total:,.2f}  |  Cash (realized): ${trader.cash():,.2f}")
-            time.sleep(interval_sec)
+            if intraday:
+                # Wake just after the next bar closes, so bar-close-to-decision latency stays bounded
+                time.sleep(seconds_until_bar_close(BAR_INTERVAL) + BAR_CLOSE_DELAY_SECONDS)
+            else:
+                time.sleep(interval_sec)
     else:
-        run_once(trader)
-        print(f"\nEquity: ${trader.total_value():,.2f}")
+        snapshot = run_once(trader)
+        if USE_JOURNAL:
+            trader.save()
+        print(f"\nEquity: ${trader.total_value(snapshot):,.2f}")
         print("Done. Use --loop to run continuously.")
 
 
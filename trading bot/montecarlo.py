@@ -0,0 +1,131 @@
+"""
+Monte Carlo risk estimation from a backtest trade list: resample the per-trade P&L thousands of
+times (bootstrap with replacement, or permutation of the actual order) and read drawdown
+distribution, risk of ruin and equity-curve confidence bands off the simulated paths.
+All paths of a batch are one 2-D NumPy array (simulations × trades); nothing loops per path.
+Run: python montecarlo.py [--days 365] [--sims 100000] [--method bootstrap|permute]
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+
+from config import SYMBOLS, INITIAL_BALANCE, MONTE_CARLO_SIMULATIONS, MONTE_CARLO_RUIN_PCT
+from backtest import run_backtest
+from report import trades_frame
+
+METHODS = ("bootstrap", "permute")
+BAND_PERCENTILES = (5, 25, 50, 75, 95)
+# Cells (simulations × trades) per batch; bounds memory to ~100 MB per float64 array
+BATCH_CELLS = 12_000_000
+# Paths used for the equity bands (percentiles per trade are the expensive part; 10k paths pin them well)
+BAND_PATHS = 10_000
+
+
+def simulate_paths(
+    pnl: np.ndarray,
+    n_sims: int,
+    method: str = "bootstrap",
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """Cumulative P&L after each trade for n_sims resampled sequences: array (n_sims, len(pnl))."""
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    rng = rng or np.random.default_rng()
+    pnl = np.asarray(pnl, dtype=float)
+    if method == "bootstrap":
+        paths = pnl[rng.integers(0, len(pnl), size=(n_sims, len(pnl)))]
+    else:
+        paths = rng.permuted(np.broadcast_to(pnl, (n_sims, len(pnl))), axis=1)
+    return np.cumsum(paths, axis=1, out=paths)
+
+
+def monte_carlo(
+    pnl,
+    n_sims: int = MONTE_CARLO_SIMULATIONS,
+    method: str = "bootstrap",
+    initial_balance: float = INITIAL_BALANCE,
+    ruin_pct: float = MONTE_CARLO_RUIN_PCT,
+    seed: int | None = None,
+) -> dict:
+    """
+    Resample per-trade P&L (USD) n_sims times. Returns:
+      final_equity / max_drawdown / max_drawdown_usd: per-simulation arrays,
+      risk_of_ruin: share of paths whose equity ever falls to ruin_pct × initial_balance,
+      bands: DataFrame of equity percentiles after each trade (rows = trade number; first BAND_PATHS paths).
+    """
+    pnl = np.asarray(pnl, dtype=float)
+    if len(pnl) == 0:
+        raise ValueError("No trades to resample")
+    rng = np.random.default_rng(seed)
+    ruin_level = ruin_pct * initial_balance
+    batch = max(1, BATCH_CELLS // len(pnl))
+    final, dd_pct, dd_usd, ruined, band_paths = [], [], [], [], []
+    kept = 0
+    for start in range(0, n_sims, batch):
+        size = min(batch, n_sims - start)
+        equity = simulate_paths(pnl, size, method, rng)
+        equity += initial_balance
+        final.append(equity[:, -1].copy())
+        ruined.append(equity.min(axis=1) <= ruin_level)
+        if kept < BAND_PATHS:
+            band_paths.append(equity[: BAND_PATHS - kept].copy())
+            kept += len(band_paths[-1])
+        peak = np.maximum.accumulate(equity, axis=1)
+        np.maximum(peak, initial_balance, out=peak)
+        drawdown = np.subtract(peak, equity, out=equity)
+        dd_usd.append(drawdown.max(axis=1))
+        dd_pct.append(np.divide(drawdown, peak, out=drawdown).max(axis=1))
+    final, dd_pct, dd_usd, ruined = (np.concatenate(x) for x in (final, dd_pct, dd_usd, ruined))
+    band = pd.DataFrame(
+        np.percentile(np.concatenate(band_paths), BAND_PERCENTILES, axis=0).T,
+        columns=[f"p{q}" for q in BAND_PERCENTILES],
+        index=pd.RangeIndex(1, len(pnl) + 1, name="trade"),
+    )
+    return {
+        "final_equity": final,
+        "max_drawdown": dd_pct,
+        "max_drawdown_usd": dd_usd,
+        "risk_of_ruin": float(ruined.mean()),
+        "bands": band,
+    }
+
+
+def summarize(result: dict) -> pd.DataFrame:
+    """Percentiles of final equity and max drawdown across simulations."""
+    rows = {
+        "final_equity": result["final_equity"],
+        "max_drawdown": result["max_drawdown"],
+        "max_drawdown_usd": result["max_drawdown_usd"],
+    }
+    return pd.DataFrame(
+        {name: np.percentile(values, BAND_PERCENTILES) for name, values in rows.items()},
+        index=[f"p{q}" for q in BAND_PERCENTILES],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo resampling of backtest trades (news off)")
+    parser.add_argument("--days", type=int, default=365, help="Days of history to backtest")
+    parser.add_argument("--sims", type=int, default=MONTE_CARLO_SIMULATIONS, help="Number of simulations")
+    parser.add_argument("--method", choices=METHODS, default="bootstrap",
+                        help="bootstrap: draw trades with replacement; permute: shuffle the actual trades")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed (reproducible runs)")
+    parser.add_argument("--out", default="montecarlo_bands.csv", help="CSV file for the equity bands")
+    args = parser.parse_args()
+
+    print(f"Backtesting {', '.join(SYMBOLS)} ({args.days} days, news OFF)...")
+    trades = trades_frame(run_backtest(days=args.days))
+    if trades.empty:
+        print("  No trades to resample.")
+        return
+    result = monte_carlo(trades["pnl"].to_numpy(), args.sims, args.method, seed=args.seed)
+    result["bands"].to_csv(args.out)
+    print(f"  {len(trades)} trades, {args.sims:,} {args.method} simulations (1 contract per trade)")
+    print(summarize(result).to_string(float_format=lambda v: f"{v:,.4f}"))
+    print(f"  Risk of ruin (equity ≤ {MONTE_CARLO_RUIN_PCT:.0%} of ${INITIAL_BALANCE:,.0f}): {result['risk_of_ruin']:.2%}")
+    print(f"  Equity bands: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
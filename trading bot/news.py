@@ -1,10 +1,30 @@
 """
 Fetch news for a symbol and compute simple keyword-based sentiment.
 Uses Yahoo Finance news (no API key required).
+Sentiment is cached per symbol for NEWS_CACHE_TTL_SECONDS; once expired, the old value is served
+for up to NEWS_STALE_SECONDS while one background thread refreshes it.
+Fetched headlines are kept in the news store (news_store.py); sentiment_asof replays them for backtests.
 """
 
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
 import yfinance as yf
-from config import USE_NEWS, NEWS_LOOKBACK_ITEMS, NEWS_SENTIMENT_BUY_MIN, NEWS_SENTIMENT_SELL_MAX
+import news_store
+from config import (
+    USE_NEWS,
+    NEWS_LOOKBACK_ITEMS,
+    NEWS_SENTIMENT_BUY_MIN,
+    NEWS_SENTIMENT_SELL_MAX,
+    NEWS_CACHE_TTL_SECONDS,
+    NEWS_STALE_SECONDS,
+    USE_NEWS_STORE,
+    NEWS_STORE_MAX_AGE_DAYS,
+    FETCH_MAX_WORKERS,
+)
 
 # Keyword-based sentiment (expand as needed)
 POSITIVE_WORDS = {
@@ -21,64 +41,269 @@ NEGATIVE_WORDS = {
 }
 
 
+# Words that flip the sentiment of the next lexicon word within NEGATION_WINDOW words ("no growth", "not a loss")
+NEGATION_WORDS = {
+    "not", "no", "never", "without", "nor", "cannot", "isn't", "aren't", "wasn't", "weren't",
+    "don't", "doesn't", "didn't", "won't", "can't", "couldn't", "hasn't", "haven't",
+}
+NEGATION_WINDOW = 3
+
+# Word -> weight (sign = direction). Same scale for every word by default; raise a weight to make
+# a word count more, e.g. {**WORD_WEIGHTS, "crash": -2.0}
+WORD_WEIGHTS = {**{w: 1.0 for w in POSITIVE_WORDS}, **{w: -1.0 for w in NEGATIVE_WORDS}}
+
+
+def _inflections(word: str) -> set[str]:
+    """word plus its common -s / -ed / -ing forms (gain -> gains, gained, gaining; rally -> rallies, rallied)."""
+    forms = {word, word + "s", word + "es", word + "ed", word + "ing"}
+    if word.endswith("e"):
+        forms |= {word + "d", word[:-1] + "ing"}
+    if word.endswith("y") and len(word) > 2 and word[-2] not in "aeiou":
+        forms |= {word[:-1] + "ies", word[:-1] + "ied"}
+    if len(word) > 2 and word[-1] not in "aeiouwxy" and word[-2] in "aeiou" and word[-3] not in "aeiou":
+        forms |= {word + word[-1] + "ed", word + word[-1] + "ing"}  # drop -> dropped, cut -> cutting
+    return forms
+
+
+class SentimentScorer:
+    """
+    Weighted keyword sentiment with negation. Texts are split into words by one compiled regex and
+    each word is looked up in a precomputed table (lexicon words and their inflections), so a batch
+    is scored in a single scan. A text scores sum(signed weights) / sum(|weights|) of its matches,
+    in [-1, 1]; 0 with no matches.
+    """
+
+    _TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?|\n")
+    _WORD, _NEWLINE, _NEGATION = 0, 1, 2  # token codes; lexicon words are 3, 4, ...
+
+    def __init__(
+        self,
+        weights: dict[str, float] | None = None,
+        negations: set[str] | None = None,
+        negation_window: int = NEGATION_WINDOW,
+    ):
+        weights = WORD_WEIGHTS if weights is None else weights
+        by_form: dict[str, float] = {}
+        for word, weight in weights.items():
+            for form in _inflections(word.lower()):
+                by_form.setdefault(form, float(weight))
+        for word, weight in weights.items():
+            by_form[word.lower()] = float(weight)  # an exact lexicon word beats another word's inflection
+        self.weights = by_form
+        self.negations = {w.lower() for w in (NEGATION_WORDS if negations is None else negations)}
+        self.negation_window = negation_window
+        self._codes = {"\n": self._NEWLINE, **{w: self._NEGATION for w in self.negations}}
+        self._codes.update({form: 3 + i for i, form in enumerate(by_form)})
+        self._code_weights = np.array([0.0, 0.0, 0.0, *by_form.values()])
+
+    @staticmethod
+    def _normalize(text: str | None) -> str:
+        return (text or "").lower().replace("\u2019", "'").replace("\n", " ")
+
+    def score(self, text: str) -> float:
+        """Score of one text (same result as score_many, without the array overhead)."""
+        net = gross = 0.0
+        negation_at = None  # token position of a negation not yet applied
+        for i, token in enumerate(self._TOKEN.findall(self._normalize(text))):
+            code = self._codes.get(token, self._WORD)
+            if code == self._NEGATION:
+                negation_at = i
+            elif code > self._NEGATION:
+                weight = float(self._code_weights[code])
+                if negation_at is not None and i - negation_at - 1 < self.negation_window:
+                    weight = -weight
+                negation_at = None
+                net += weight
+                gross += abs(weight)
+        return net / gross if gross else 0.0
+
+    def score_many(self, texts: list[str]) -> np.ndarray:
+        """Scores for a batch of texts from a single scan over all of them."""
+        n = len(texts)
+        joined = "\n".join(self._normalize(t) for t in texts)
+        tokens = self._TOKEN.findall(joined)
+        codes = np.fromiter((self._codes.get(t, 0) for t in tokens), dtype=np.int64, count=len(tokens))
+        pos = np.arange(len(codes))
+        row = np.cumsum(codes == self._NEWLINE)
+        lexicon = codes > self._NEGATION
+
+        def last_at_or_before(mask):
+            return np.maximum.accumulate(np.where(mask, pos, -1)) if len(pos) else pos
+
+        # A lexicon word is negated if the nearest negation before it is in the same text, within
+        # negation_window words, and not already used by an earlier lexicon word
+        last_negation = last_at_or_before(codes == self._NEGATION)
+        last_newline = last_at_or_before(codes == self._NEWLINE)
+        last_lexicon_before = np.concatenate(([-1], last_at_or_before(lexicon)[:-1])) if len(pos) else pos
+        negated = (
+            (last_negation > last_newline)
+            & (last_negation > last_lexicon_before)
+            & (pos - last_negation - 1 < self.negation_window)
+        )
+        weight = self._code_weights[codes[lexicon]] * np.where(negated[lexicon], -1.0, 1.0)
+        net = np.bincount(row[lexicon], weight, minlength=n)[:n]
+        gross = np.bincount(row[lexicon], np.abs(weight), minlength=n)[:n]
+        return np.divide(net, gross, out=np.zeros(n), where=gross > 0)
+
+
+_SCORER = SentimentScorer()
+
+
+def score_headlines(texts: list[str], scorer: SentimentScorer | None = None) -> np.ndarray:
+    """Sentiment in [-1, 1] for each text (e.g. thousands of historical headlines for a backtest)."""
+    return (scorer or _SCORER).score_many(list(texts))
+
+
 def _sentiment_score(text: str) -> float:
     """
-    Score text from -1 (negative) to +1 (positive) using keyword counts.
+    Score text from -1 (negative) to +1 (positive) using the weighted keyword lexicon.
     Returns 0 if no keywords or empty text.
     """
-    if not text or not text.strip():
-        return 0.0
-    lower = text.lower()
-    pos = sum(1 for w in POSITIVE_WORDS if w in lower)
-    neg = sum(1 for w in NEGATIVE_WORDS if w in lower)
-    total = pos + neg
-    if total == 0:
-        return 0.0
-    return (pos - neg) / total
+    return _SCORER.score(text)
 
 
-def get_news_sentiment(symbol: str) -> float | None:
+def _headline(item, fetched_at: int) -> tuple[int, str, str]:
     """
-    Fetch recent news for symbol and return aggregate sentiment in [-1, 1].
-    Returns None if news is disabled or fetch fails.
+    (published epoch s, title, publisher) of a yfinance news item, flat or nested under "content".
+    Items without a publish time are dated fetched_at.
+    """
+    if isinstance(item, dict):
+        get = item.get
+    else:
+        def get(key):
+            return getattr(item, key, None)
+    content = get("content") or {}
+    title = get("title") or content.get("title") or ""
+    pub = get("publisher") or (content.get("provider") or {}).get("displayName") or ""
+    published = get("providerPublishTime") or content.get("pubDate")
+    try:
+        if isinstance(published, (int, float)):
+            ts = int(published)
+        else:
+            ts = int(pd.Timestamp(published).timestamp())
+    except (TypeError, ValueError):
+        ts = fetched_at
+    return ts, title, pub
+
+
+def fetch_news_sentiment(symbol: str) -> float | None:
+    """
+    Fetch recent news for symbol and return aggregate sentiment in [-1, 1] (always hits the network).
+    Every fetched headline is added to the news store. Returns None if there is no news or the fetch fails.
     """
-    if not USE_NEWS:
-        return None
     try:
         ticker = yf.Ticker(symbol)
         items = getattr(ticker, "news", None)
         if not items:
             return None
-        items = items[:NEWS_LOOKBACK_ITEMS]
-        scores = []
-        for item in items:
-            if isinstance(item, dict):
-                title = item.get("title") or ""
-                pub = item.get("publisher", "") or ""
-            else:
-                title = getattr(item, "title", None) or ""
-                pub = getattr(item, "publisher", None) or ""
-            text = f"{title} {pub}"
-            s = _sentiment_score(text)
-            scores.append(s)
-        if not scores:
+        fetched_at = int(time.time())
+        headlines = [_headline(item, fetched_at) for item in items]
+        if USE_NEWS_STORE:
+            try:
+                news_store.store_headlines(symbol, headlines)
+            except Exception:  # a failed write must not cost the live sentiment
+                pass
+        texts = [f"{title} {pub}" for _, title, pub in headlines[:NEWS_LOOKBACK_ITEMS]]
+        if not texts:
             return None
-        return sum(scores) / len(scores)
+        return float(score_headlines(texts).mean())
     except Exception:
         return None
 
 
-def news_allows_buy(symbol: str) -> bool:
+def sentiment_asof(
+    symbol: str,
+    times: pd.DatetimeIndex,
+    lookback_items: int = NEWS_LOOKBACK_ITEMS,
+    max_age_days: float = NEWS_STORE_MAX_AGE_DAYS,
+    scorer: SentimentScorer | None = None,
+) -> pd.Series:
+    """
+    Sentiment of symbol as of each time, from the news store: the mean score of the latest
+    lookback_items headlines published at or before it and at most max_age_days old (what a live
+    fetch would have seen). NaN where there were none. One as-of join over the whole index.
+    """
+    times = pd.DatetimeIndex(times)
+    utc = times.tz_convert("UTC") if times.tz is not None else times.tz_localize("UTC")
+    headlines = news_store.load_headlines(symbol, end=utc.max() if len(utc) else None)
+    scores = score_headlines((headlines["title"] + " " + headlines["publisher"]).tolist(), scorer)
+    published = pd.DatetimeIndex(headlines["published"]).as_unit("s").asi8
+    t = utc.as_unit("s").asi8
+    hi = np.searchsorted(published, t, side="right")  # headlines [lo, hi) count at t
+    lo = np.maximum(hi - lookback_items, np.searchsorted(published, t - int(max_age_days * 86400), side="left"))
+    total = np.concatenate(([0.0], np.cumsum(scores)))
+    count = hi - lo
+    values = np.divide(total[hi] - total[lo], count, out=np.full(len(t), np.nan), where=count > 0)
+    return pd.Series(values, index=times)
+
+
+# symbol -> (monotonic time fetched, sentiment); None (no news / failed fetch) is cached too
+_CACHE: dict[str, tuple[float, float | None]] = {}
+_REFRESHING: set[str] = set()
+_LOCK = threading.Lock()
+
+
+def _store(symbol: str, sentiment: float | None) -> None:
+    with _LOCK:
+        _CACHE[symbol] = (time.monotonic(), sentiment)
+        _REFRESHING.discard(symbol)
+
+
+def _refresh(symbol: str) -> None:
+    _store(symbol, fetch_news_sentiment(symbol))
+
+
+def get_news_sentiment(symbol: str) -> float | None:
+    """
+    Aggregate news sentiment for symbol in [-1, 1], fetched at most once per NEWS_CACHE_TTL_SECONDS.
+    A stale value is returned immediately while it refreshes in the background.
+    Returns None if news is disabled or unavailable.
+    """
+    if not USE_NEWS:
+        return None
+    with _LOCK:
+        entry = _CACHE.get(symbol)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age <= NEWS_CACHE_TTL_SECONDS:
+                return entry[1]
+            if age <= NEWS_CACHE_TTL_SECONDS + NEWS_STALE_SECONDS:
+                if symbol not in _REFRESHING:
+                    _REFRESHING.add(symbol)
+                    threading.Thread(target=_refresh, args=(symbol,), name=f"news-{symbol}", daemon=True).start()
+                return entry[1]
+    sentiment = fetch_news_sentiment(symbol)
+    _store(symbol, sentiment)
+    return sentiment
+
+
+def prefetch_news(symbols: list[str]) -> dict[str, float | None]:
+    """Sentiment for each symbol (symbol -> score); cache misses are fetched concurrently. {} if news is off."""
+    symbols = list(dict.fromkeys(symbols))
+    if not USE_NEWS or not symbols:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(FETCH_MAX_WORKERS, len(symbols)), thread_name_prefix="news") as pool:
+        return dict(zip(symbols, pool.map(get_news_sentiment, symbols)))
+
+
+def _sentiment(symbol: str, news: dict | None) -> float | None:
+    """Prefetched sentiment from news (symbol -> score) if present, else from the cache."""
+    if news is not None and symbol in news:
+        return news[symbol]
+    return get_news_sentiment(symbol)
+
+
+def news_allows_buy(symbol: str, news: dict | None = None) -> bool:
     """True if news sentiment is above BUY threshold (or news disabled / unavailable)."""
-    sent = get_news_sentiment(symbol)
+    sent = _sentiment(symbol, news)
     if sent is None:
         return True  # no news = don't block
     return sent >= NEWS_SENTIMENT_BUY_MIN
 
 
-def news_suggests_sell(symbol: str) -> bool:
+def news_suggests_sell(symbol: str, news: dict | None = None) -> bool:
     """True if news sentiment is below SELL threshold (strong negative)."""
-    sent = get_news_sentiment(symbol)
+    sent = _sentiment(symbol, news)
     if sent is None:
         return False
     return sent <= NEWS_SENTIMENT_SELL_MAX
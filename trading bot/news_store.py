@@ -0,0 +1,121 @@
+"""
+Local history of news headlines (SQLite), so backtests can apply the same news gate as live trading.
+news.get_news_sentiment stores every headline it fetches; archives can be bulk-imported:
+
+  python news_store.py headlines.csv [more.json ...] [--symbol MGC=F]
+
+Archives are CSV, JSON (a list of objects) or JSON lines with a title, a publish time
+(published / date / pubDate / providerPublishTime: ISO text or epoch seconds), optionally a
+publisher and a symbol (else --symbol). Headlines are stored raw and scored when read, so lexicon
+changes in news.py apply to the whole history.
+"""
+
+import argparse
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+import pandas as pd
+from config import NEWS_STORE_PATH
+
+TIME_COLUMNS = ("published", "date", "pubDate", "providerPublishTime")
+
+
+@contextmanager
+def _connect():
+    """Open the store (creating the table on first use); commits on success and always closes."""
+    NEWS_STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(NEWS_STORE_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS headlines ("
+        " symbol TEXT, published INTEGER, title TEXT, publisher TEXT,"
+        " PRIMARY KEY (symbol, published, title))"
+    )
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def store_headlines(symbol: str, rows: list[tuple[int, str, str]]) -> None:
+    """Add (published epoch s, title, publisher) rows for symbol; headlines already stored are skipped."""
+    rows = [(symbol, int(ts), title, publisher or "") for ts, title, publisher in rows if title]
+    if not rows:
+        return
+    with _connect() as conn:
+        conn.executemany("INSERT OR IGNORE INTO headlines VALUES (?, ?, ?, ?)", rows)
+
+
+def load_headlines(symbol: str, end: pd.Timestamp | None = None) -> pd.DataFrame:
+    """Stored headlines for symbol, oldest first: published (UTC), title, publisher. end bounds published (inclusive)."""
+    sql = "SELECT published, title, publisher FROM headlines WHERE symbol = ?"
+    params: list = [symbol]
+    if end is not None:
+        sql += " AND published <= ?"
+        params.append(int(end.timestamp()))
+    sql += " ORDER BY published, title"
+    if not NEWS_STORE_PATH.exists():
+        rows = []
+    else:
+        with _connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+    df = pd.DataFrame(rows, columns=["published", "title", "publisher"])
+    df["published"] = pd.to_datetime(df["published"].astype("int64"), unit="s", utc=True)
+    return df
+
+
+def _epoch_seconds(values: pd.Series) -> pd.Series:
+    """Publish times (epoch seconds, date text or datetimes) as int epoch seconds."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return pd.to_datetime(values, utc=True).dt.as_unit("s").astype("int64")
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.notna().all():
+        return numeric.astype("int64")
+    return pd.to_datetime(values, utc=True).dt.as_unit("s").astype("int64")
+
+
+def read_archive(path: str | Path, symbol: str | None = None) -> pd.DataFrame:
+    """Headlines from a CSV / JSON / JSON-lines archive as columns symbol, published (epoch s), title, publisher."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        df = pd.read_csv(path)
+    else:
+        # convert_dates=False: read_json would parse a "date" column itself, which _epoch_seconds does
+        df = pd.read_json(path, lines=path.suffix.lower() == ".jsonl", convert_dates=False)
+    time_col = next((c for c in TIME_COLUMNS if c in df.columns), None)
+    if time_col is None or "title" not in df.columns:
+        raise ValueError(f"{path}: needs a title column and one of {TIME_COLUMNS}")
+    if symbol is not None:
+        df["symbol"] = symbol
+    elif "symbol" not in df.columns:
+        raise ValueError(f"{path}: no symbol column; pass --symbol")
+    out = pd.DataFrame({
+        "symbol": df["symbol"].astype(str),
+        "published": _epoch_seconds(df[time_col]),
+        "title": df["title"].fillna("").astype(str),
+        "publisher": df["publisher"].fillna("").astype(str) if "publisher" in df.columns else "",
+    })
+    return out[out["title"] != ""]
+
+
+def import_archive(path: str | Path, symbol: str | None = None) -> int:
+    """Store every headline of an archive; returns the number of rows read."""
+    df = read_archive(path, symbol)
+    for sym, group in df.groupby("symbol"):
+        store_headlines(sym, list(zip(group["published"], group["title"], group["publisher"])))
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import news headline archives into the local news store")
+    parser.add_argument("files", nargs="+", help="CSV, JSON or JSON-lines archives")
+    parser.add_argument("--symbol", help="Symbol for archives without a symbol column")
+    args = parser.parse_args()
+    for path in args.files:
+        print(f"  {path}: {import_archive(path, args.symbol)} headlines")
+    print(f"  Store: {NEWS_STORE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,23 @@
-"""Paper trading for futures: contracts, entry prices, P&L, 1:4 risk–reward."""
+"""
+Paper trading for futures: contracts, entry prices, P&L, 1:4 risk–reward.
+No network I/O: prices, ATR and SL/TP distances come from the market context passed in (data.MarketContext,
+or anything with latest_price / atr / atr_ratio / sl_tp such as MarketSnapshot), so order decisions are in memory.
+"""
 
+import time
 from dataclasses import dataclass, field
+import journal
 from config import (
     INITIAL_BALANCE,
     POSITION_SIZE_PCT,
     MAX_CONTRACTS_PER_TRADE,
     FIXED_CONTRACTS,
     USE_ATR_POSITION_SIZING,
-    ATR_PERIOD,
     ATR_SIZING_CAP,
-    USE_SL_TP,
-    SL_TP_TICKS,
-    TICK_SIZES,
-    RISK_REWARD_RATIO,
-    STOP_LOSS_ATR_MULT,
     get_multiplier,
 )
-from data import get_latest_price, get_atr_ratio, get_atr
+from data import MarketContext
+from params import StrategyParams, DEFAULT_PARAMS
 
 
 @dataclass
@@ -28,6 +29,9 @@ class PaperTrader:
     entry_prices: dict[str, float] = field(default_factory=dict)  # symbol -> volume-weighted avg entry
     sl_prices: dict[str, float] = field(default_factory=dict)   # symbol -> stop loss price (long: below entry)
     tp_prices: dict[str, float] = field(default_factory=dict)   # symbol -> take profit price (long: above entry)
+    params: StrategyParams = DEFAULT_PARAMS  # SL/TP and ATR settings (defaults from config.py)
+    journaling: bool = field(default=False, repr=False)  # queue fills for save(); load() turns it on
+    pending: list[tuple] = field(default_factory=list, repr=False)  # fills not yet written by save()
 
     def cash(self) -> float:
         return self.balance
@@ -36,8 +40,8 @@ class PaperTrader:
         """Number of contracts (long)."""
         return self.positions.get(symbol, 0)
 
-    def _equity_before_open(self, symbol: str) -> float:
-        """Total equity for sizing (balance + unrealized P&L on other symbols)."""
+    def _equity_before_open(self, symbol: str, market: MarketContext) -> float:
+        """Total equity for sizing (balance + unrealized P&L on other symbols priced in market)."""
         eq = self.balance
         for sym, contracts in self.positions.items():
             if contracts <= 0 or sym == symbol:
@@ -45,13 +49,14 @@ class PaperTrader:
             entry = self.entry_prices.get(sym)
             if entry is None:
                 continue
-            p = get_latest_price(sym)
+            p = market.latest_price(sym)
             if p is not None:
                 mult = get_multiplier(sym)
                 eq += contracts * (p - entry) * mult
         return eq
 
-    def buy(self, symbol: str, contracts: int, price: float) -> bool:
+    def buy(self, symbol: str, contracts: int, price: float, market: MarketContext | None = None) -> bool:
+        """Open or add to a long; SL/TP distances from market (params.sl_tp_distances), else ticks or 0.01."""
         if contracts <= 0:
             return False
         prev = self.positions.get(symbol, 0)
@@ -63,24 +68,13 @@ class PaperTrader:
             self.entry_prices[symbol] = total_cost / (prev + contracts)
         self.positions[symbol] = prev + contracts
         entry = self.entry_prices[symbol]
-        if USE_SL_TP:
-            if symbol in SL_TP_TICKS and symbol in TICK_SIZES:
-                risk_ticks, reward_ticks = SL_TP_TICKS[symbol]
-                tick = TICK_SIZES[symbol]
-                risk_dist = risk_ticks * tick
-                reward_dist = reward_ticks * tick
-                self.sl_prices[symbol] = entry - risk_dist
-                self.tp_prices[symbol] = entry + reward_dist
-            else:
-                atr = get_atr(symbol, period=ATR_PERIOD)
-                if atr is not None and atr > 0:
-                    risk_dist = STOP_LOSS_ATR_MULT * atr
-                    reward_dist = RISK_REWARD_RATIO * risk_dist
-                    self.sl_prices[symbol] = entry - risk_dist
-                    self.tp_prices[symbol] = entry + reward_dist
-                else:
-                    self.sl_prices[symbol] = entry - 0.01
-                    self.tp_prices[symbol] = entry + 0.01 * RISK_REWARD_RATIO
+        p = self.params
+        if p.use_sl_tp:
+            dist = market.sl_tp(symbol, p) if market is not None else None
+            risk_dist, reward_dist = dist if dist is not None else p.fixed_sl_tp(symbol)
+            self.sl_prices[symbol] = entry - risk_dist
+            self.tp_prices[symbol] = entry + reward_dist
+        self._record("BUY", symbol, contracts, price)
         return True
 
     def sell(self, symbol: str, contracts: int, price: float) -> bool:
@@ -103,22 +97,76 @@ class PaperTrader:
                 del self.sl_prices[symbol]
             if symbol in self.tp_prices:
                 del self.tp_prices[symbol]
+        self._record("SELL", symbol, to_sell, price)
         return True
 
+    def _record(self, kind: str, symbol: str, contracts: int, price: float) -> None:
+        """Queue a fill with the symbol's resulting state for the journal (only when journaling)."""
+        if not self.journaling:
+            return
+        self.pending.append((
+            time.time(), kind, symbol, contracts, price, self.positions.get(symbol, 0),
+            self.entry_prices.get(symbol), self.sl_prices.get(symbol), self.tp_prices.get(symbol), self.balance,
+        ))
+
+    def _apply(self, event: tuple) -> None:
+        """Replay one journal event (see journal.EVENT_COLUMNS)."""
+        _, _, symbol, _, _, position, entry, sl, tp, balance = event
+        self.balance = balance
+        for book, value in ((self.positions, position), (self.entry_prices, entry),
+                            (self.sl_prices, sl), (self.tp_prices, tp)):
+            if position > 0 and value is not None:
+                book[symbol] = value
+            else:
+                book.pop(symbol, None)
+
+    def state(self) -> dict:
+        """Balance and open positions (with entries and SL/TP) as plain data."""
+        return {
+            "balance": self.balance,
+            "positions": dict(self.positions),
+            "entry_prices": dict(self.entry_prices),
+            "sl_prices": dict(self.sl_prices),
+            "tp_prices": dict(self.tp_prices),
+        }
+
+    def save(self) -> None:
+        """
+        Append the fills queued since the last save to the journal in one transaction (see journal.append:
+        the state is snapshotted only every JOURNAL_SNAPSHOT_EVERY fills). No-op when not journaling.
+        """
+        journal.append(self.pending, self.state())
+        self.pending.clear()
+
+    @classmethod
+    def load(cls, params: StrategyParams = DEFAULT_PARAMS) -> "PaperTrader":
+        """Trader restored from the journal (latest snapshot + fills after it); a fresh one if there is none."""
+        state, events = journal.load()
+        trader = cls(params=params, journaling=True)
+        if state is not None:
+            trader.balance = state["balance"]
+            trader.positions = {s: int(c) for s, c in state["positions"].items()}
+            trader.entry_prices = dict(state["entry_prices"])
+            trader.sl_prices = dict(state["sl_prices"])
+            trader.tp_prices = dict(state["tp_prices"])
+        for event in events:
+            trader._apply(event)
+        return trader
+
     def should_stop_loss(self, symbol: str, price: float) -> bool:
         """True if long position should be closed by stop loss (price <= SL)."""
-        if not USE_SL_TP or symbol not in self.sl_prices:
+        if not self.params.use_sl_tp or symbol not in self.sl_prices:
             return False
         return price <= self.sl_prices[symbol]
 
     def should_take_profit(self, symbol: str, price: float) -> bool:
         """True if long position should be closed by take profit (price >= TP)."""
-        if not USE_SL_TP or symbol not in self.tp_prices:
+        if not self.params.use_sl_tp or symbol not in self.tp_prices:
             return False
         return price >= self.tp_prices[symbol]
 
-    def total_value(self) -> float:
-        """Equity = balance + unrealized P&L on all open positions."""
+    def total_value(self, market: MarketContext) -> float:
+        """Equity = balance + unrealized P&L on open positions priced in market (any it has no price for at entry)."""
         total = self.balance
         for sym, contracts in self.positions.items():
             if contracts <= 0:
@@ -126,16 +174,16 @@ class PaperTrader:
             entry = self.entry_prices.get(sym)
             if entry is None:
                 continue
-            p = get_latest_price(sym)
+            p = market.latest_price(sym)
             if p is not None:
                 mult = get_multiplier(sym)
                 total += contracts * (p - entry) * mult
         return total
 
-    def contracts_to_buy(self, symbol: str, price: float) -> int:
+    def contracts_to_buy(self, symbol: str, price: float, market: MarketContext) -> int:
         """
         Number of contracts to open. If symbol is in FIXED_CONTRACTS, use that; else
-        use POSITION_SIZE_PCT of equity (notional) with ATR sizing.
+        use POSITION_SIZE_PCT of equity (notional) with ATR sizing from market.
         """
         if symbol in FIXED_CONTRACTS:
             return max(0, FIXED_CONTRACTS[symbol])
@@ -145,10 +193,10 @@ class PaperTrader:
         notional_per_contract = price * mult
         if notional_per_contract <= 0:
             return 0
-        equity = self._equity_before_open(symbol)
+        equity = self._equity_before_open(symbol, market)
         size_pct = POSITION_SIZE_PCT
         if USE_ATR_POSITION_SIZING:
-            ratio = get_atr_ratio(symbol, period=ATR_PERIOD)
+            ratio = market.atr_ratio(symbol, period=self.params.atr_period)
             if ratio is not None:
                 size_pct *= min(ratio, ATR_SIZING_CAP)
         risk_notional = equity * size_pct
@@ -0,0 +1,117 @@
+"""
+Strategy parameters as one immutable, hashable object.
+config.py provides the defaults; pass a StrategyParams explicitly to run a variant
+(e.g. sweep.py) without editing config.py or touching module globals.
+"""
+
+from dataclasses import dataclass, fields, replace
+import pandas as pd
+import config
+from volatility import sl_tp_distance_series
+
+
+@dataclass(frozen=True, slots=True)
+class StrategyParams:
+    """Every threshold/period used by strategy signals and SL/TP exits. Defaults come from config.py."""
+
+    # --- Volume ---
+    volume_avg_days: int = config.VOLUME_AVG_DAYS
+    volume_min_ratio: float = config.VOLUME_MIN_RATIO
+    obv_ma_period: int = config.OBV_MA_PERIOD
+    # --- Math ---
+    roc_period: int = config.ROC_PERIOD
+    roc_buy_min: float = config.ROC_BUY_MIN
+    roc_sell_max: float = config.ROC_SELL_MAX
+    bb_period: int = config.BB_PERIOD
+    bb_std: float = config.BB_STD
+    require_above_lower_band: bool = config.REQUIRE_ABOVE_LOWER_BAND
+    use_rsi: bool = config.USE_RSI
+    rsi_period: int = config.RSI_PERIOD
+    rsi_overbought: float = config.RSI_OVERBOUGHT
+    rsi_oversold: float = config.RSI_OVERSOLD
+    use_macd: bool = config.USE_MACD
+    macd_fast: int = config.MACD_FAST
+    macd_slow: int = config.MACD_SLOW
+    macd_signal: int = config.MACD_SIGNAL
+    use_adx: bool = config.USE_ADX
+    adx_period: int = config.ADX_PERIOD
+    adx_min: float = config.ADX_MIN
+    use_mfi: bool = config.USE_MFI
+    mfi_period: int = config.MFI_PERIOD
+    mfi_overbought: float = config.MFI_OVERBOUGHT
+    mfi_oversold: float = config.MFI_OVERSOLD
+    use_stochastic: bool = config.USE_STOCHASTIC
+    stoch_k_period: int = config.STOCH_K_PERIOD
+    stoch_d_period: int = config.STOCH_D_PERIOD
+    stoch_overbought: float = config.STOCH_OVERBOUGHT
+    stoch_oversold: float = config.STOCH_OVERSOLD
+    use_zscore: bool = config.USE_ZSCORE
+    zscore_period: int = config.ZSCORE_PERIOD
+    zscore_buy_max: float = config.ZSCORE_BUY_MAX
+    zscore_sell_extreme: float = config.ZSCORE_SELL_EXTREME
+    # --- Exits (1:4 SL/TP) ---
+    use_sl_tp: bool = config.USE_SL_TP
+    # symbol -> (risk_ticks, reward_ticks) and symbol -> tick size, as sorted tuples so the object stays hashable
+    sl_tp_ticks: tuple = tuple(sorted(config.SL_TP_TICKS.items()))
+    tick_sizes: tuple = tuple(sorted(config.TICK_SIZES.items()))
+    atr_period: int = config.ATR_PERIOD
+    risk_reward_ratio: float = config.RISK_REWARD_RATIO
+    stop_loss_atr_mult: float = config.STOP_LOSS_ATR_MULT
+
+    def ticks_for(self, symbol: str) -> tuple[tuple[int, int], float] | None:
+        """((risk_ticks, reward_ticks), tick_size) if symbol has tick-based SL/TP, else None."""
+        ticks = dict(self.sl_tp_ticks).get(symbol)
+        tick = dict(self.tick_sizes).get(symbol)
+        if ticks is None or tick is None:
+            return None
+        return ticks, tick
+
+    def fixed_sl_tp(self, symbol: str) -> tuple[float, float]:
+        """(stop, target) distances without ATR: the tick-based ones if configured, else 0.01 / 0.01 × R:R."""
+        ticks = self.ticks_for(symbol)
+        if ticks is not None:
+            (risk_ticks, reward_ticks), tick = ticks
+            return risk_ticks * tick, reward_ticks * tick
+        return 0.01, 0.01 * self.risk_reward_ratio
+
+    def sl_tp_distances(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Stop and target distances for a long entered at each bar of df (columns risk, reward), cached
+        per frame: tick-based if configured, else ATR × STOP_LOSS_ATR_MULT and × RISK_REWARD_RATIO.
+        """
+        fixed = self.fixed_sl_tp(symbol) if self.ticks_for(symbol) is not None else None
+        return sl_tp_distance_series(df, self.atr_period, self.stop_loss_atr_mult, self.risk_reward_ratio, fixed)
+
+    def lookback(self) -> int:
+        """Minimum bars needed for all indicators."""
+        return max(
+            self.volume_avg_days, self.obv_ma_period, self.roc_period, self.bb_period,
+            self.rsi_period + 2 if self.use_rsi else 0,
+            self.macd_slow + self.macd_signal + 2 if self.use_macd else 0,
+            self.adx_period + 2 if self.use_adx else 0,
+            self.mfi_period + 2 if self.use_mfi else 0,
+            self.stoch_k_period + self.stoch_d_period + 2 if self.use_stochastic else 0,
+            self.zscore_period + 2 if self.use_zscore else 0,
+        ) + 2
+
+    def with_overrides(self, **overrides) -> "StrategyParams":
+        """
+        Copy with some fields changed. Keys are field names, case-insensitive, so config
+        names work too (RSI_OVERBOUGHT=75). SL_TP_TICKS also takes a dict or one (risk, reward)
+        pair applied to every tick-based symbol. Raises ValueError on unknown names.
+        """
+        names = {f.name for f in fields(self)}
+        changes = {}
+        for key, value in overrides.items():
+            name = key.lower()
+            if name not in names:
+                raise ValueError(f"Unknown strategy parameter: {key}")
+            if name in ("sl_tp_ticks", "tick_sizes") and isinstance(value, dict):
+                value = tuple(sorted(value.items()))
+            elif name == "sl_tp_ticks" and len(value) == 2 and not isinstance(value[0], tuple):
+                value = tuple((symbol, tuple(value)) for symbol, _ in self.sl_tp_ticks)
+            changes[name] = value
+        return replace(self, **changes)
+
+
+DEFAULT_PARAMS = StrategyParams()
@@ -0,0 +1,170 @@
+"""
+Portfolio backtest: all symbols on one time axis with shared equity and margin.
+Uses PaperTrader for sizing (FIXED_CONTRACTS / POSITION_SIZE_PCT + ATR sizing), SL/TP and P&L
+(with futures multipliers), fed from the bar stream instead of live downloads.
+Run: python portfolio_backtest.py [--days 730] [--symbols ES=F NQ=F ...] [--out portfolio_equity.csv]
+"""
+
+import argparse
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+from config import SYMBOLS, INITIAL_BALANCE, INTRABAR_PATH_MODEL, MARGIN_PCT_OF_NOTIONAL, get_multiplier
+from data import fetch_all
+from params import StrategyParams, DEFAULT_PARAMS
+from paper_trader import PaperTrader
+from strategy import get_signal_series
+from backtest import _path_exit
+from volatility import atr_at, atr_ratio_at
+
+
+class BarSnapshot:
+    """
+    MarketSnapshot stand-in for one backtest step: every lookup reads the symbol's current bar
+    (set via .rows) from arrays computed once per frame, so sizing and P&L do no I/O and no recomputation.
+    """
+
+    def __init__(self, frames: dict[str, pd.DataFrame]):
+        self.frames = frames
+        self.rows: dict[str, int] = {}  # symbol -> index of its current bar
+        self._closes = {symbol: df["Close"].to_numpy(dtype=float) for symbol, df in frames.items()}
+
+    def prices(self, symbol: str) -> pd.DataFrame | None:
+        row = self.rows.get(symbol)
+        if row is None:
+            return None
+        return self.frames[symbol].iloc[: row + 1]
+
+    closed_prices = prices
+
+    def latest_price(self, symbol: str) -> float | None:
+        row = self.rows.get(symbol)
+        return None if row is None else float(self._closes[symbol][row])
+
+    def atr(self, symbol: str, period: int = 14) -> float | None:
+        """Same result as atr_from_df on the bars up to the current one."""
+        row = self.rows.get(symbol)
+        return None if row is None else atr_at(self.frames[symbol], row, period)
+
+    def atr_ratio(self, symbol: str, period: int = 14, ma_days: int = 20) -> float | None:
+        """Same result as atr_ratio_from_df on the bars up to the current one."""
+        row = self.rows.get(symbol)
+        return None if row is None else atr_ratio_at(self.frames[symbol], row, period, ma_days)
+
+    def sl_tp(self, symbol: str, params) -> tuple[float, float] | None:
+        """(stop, target) distances for a long entered at the current bar."""
+        row = self.rows.get(symbol)
+        if row is None:
+            return None
+        dist = params.sl_tp_distances(symbol, self.frames[symbol])
+        return float(dist["risk"].iat[row]), float(dist["reward"].iat[row])
+
+
+@dataclass
+class PortfolioResult:
+    equity: pd.Series  # total equity (cash + unrealized) after each time step
+    trades: list       # (symbol, entry_date, exit_date, contracts, entry_price, exit_price, reason, pnl)
+    trader: PaperTrader
+
+
+def _margin(trader: PaperTrader, snapshot: BarSnapshot) -> float:
+    """Initial margin tied up by open positions."""
+    used = 0.0
+    for symbol, contracts in trader.positions.items():
+        price = snapshot.latest_price(symbol) or trader.entry_prices.get(symbol, 0.0)
+        used += contracts * price * get_multiplier(symbol) * MARGIN_PCT_OF_NOTIONAL
+    return used
+
+
+def run_portfolio_backtest(
+    frames: dict[str, pd.DataFrame | None],
+    params: StrategyParams | None = None,
+    initial_balance: float = INITIAL_BALANCE,
+    path_model: str = INTRABAR_PATH_MODEL,
+) -> PortfolioResult:
+    """
+    Step every symbol together along the union of their bar times. Per bar: an open position exits
+    on SL/TP (bar low/high) or a SELL signal at the close; a flat symbol enters on BUY at the close,
+    sized by PaperTrader against the shared equity and capped by available margin.
+    """
+    p = params or DEFAULT_PARAMS
+    lookback = p.lookback()
+    frames = {s: df for s, df in frames.items() if df is not None and len(df) >= lookback}
+    trader = PaperTrader(balance=initial_balance, params=p)
+    snapshot = BarSnapshot(frames)
+    if not frames:
+        return PortfolioResult(pd.Series(dtype=float), [], trader)
+
+    signals = {s: get_signal_series(df, p).to_numpy() for s, df in frames.items()}
+    bars = {
+        s: tuple(df[c].to_numpy(dtype=float) if c in df else df["Close"].to_numpy(dtype=float)
+                 for c in ("Open", "High", "Low", "Close"))
+        for s, df in frames.items()
+    }
+    timeline = frames[next(iter(frames))].index
+    for df in frames.values():
+        timeline = timeline.union(df.index)
+    events: list[list[tuple[str, int]]] = [[] for _ in range(len(timeline))]
+    for s, df in frames.items():
+        for row, step in enumerate(timeline.get_indexer(df.index)):
+            events[step].append((s, row))
+
+    equity = np.empty(len(timeline))
+    trades = []
+    open_dates: dict[str, pd.Timestamp] = {}
+    for step, step_events in enumerate(events):
+        for s, row in step_events:
+            snapshot.rows[s] = row
+        for s, row in step_events:
+            opens, highs, lows, closes = bars[s]
+            held = trader.position(s)
+            if held > 0:
+                exit_price, reason = None, None
+                sl, tp = trader.sl_prices.get(s), trader.tp_prices.get(s)
+                if p.use_sl_tp and sl is not None and tp is not None and (lows[row] <= sl or highs[row] >= tp):
+                    exit_price, reason = _path_exit(opens[row], highs[row], lows[row], closes[row], sl, tp, path_model)
+                elif signals[s][row] == "SELL":
+                    exit_price, reason = float(closes[row]), "SIGNAL"
+                if exit_price is not None:
+                    entry = trader.entry_prices[s]
+                    pnl = held * (exit_price - entry) * get_multiplier(s)
+                    trader.sell(s, held, exit_price)
+                    trades.append((s, open_dates.pop(s), frames[s].index[row], held, entry, exit_price, reason, pnl))
+            elif row >= lookback and signals[s][row] == "BUY":
+                price = float(closes[row])
+                contracts = trader.contracts_to_buy(s, price, snapshot)
+                per_contract = price * get_multiplier(s) * MARGIN_PCT_OF_NOTIONAL
+                if per_contract > 0:
+                    free = trader.total_value(snapshot) - _margin(trader, snapshot)
+                    contracts = min(contracts, max(0, int(free // per_contract)))
+                if contracts >= 1 and trader.buy(s, contracts, price, snapshot):
+                    open_dates[s] = frames[s].index[row]
+        equity[step] = trader.total_value(snapshot)
+
+    return PortfolioResult(pd.Series(equity, index=timeline, name="equity"), trades, trader)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest all symbols together with shared equity (news off)")
+    parser.add_argument("--days", type=int, default=730, help="Days of history")
+    parser.add_argument("--symbols", nargs="+", default=list(SYMBOLS), help="Symbols (default: config SYMBOLS)")
+    parser.add_argument("--out", default="portfolio_equity.csv", help="CSV file for the equity curve")
+    args = parser.parse_args()
+
+    print(f"Portfolio backtest: {', '.join(args.symbols)} ({args.days} days, news OFF)...")
+    result = run_portfolio_backtest(fetch_all(args.symbols, days=args.days))
+    if result.equity.empty:
+        print("  No data.")
+        return
+    result.equity.to_csv(args.out)
+    final = result.equity.iloc[-1]
+    drawdown = (result.equity / result.equity.cummax() - 1).min()
+    print(f"  Trades: {len(result.trades)}")
+    print(f"  Final equity: ${final:,.2f}  ({final / INITIAL_BALANCE - 1:+.2%})")
+    print(f"  Max drawdown: {drawdown:.2%}")
+    print(f"  Equity curve: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
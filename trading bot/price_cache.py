@@ -0,0 +1,108 @@
+"""
+Local on-disk OHLCV bar store (SQLite, one table for all symbols/intervals).
+data.get_prices reads from here and only downloads bars newer than the last stored one.
+"""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+import pandas as pd
+from config import PRICE_CACHE_PATH
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+@contextmanager
+def _connect():
+    """Open the cache DB (creating tables on first use); commits on success and always closes."""
+    PRICE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(PRICE_CACHE_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS bars ("
+        " symbol TEXT, interval TEXT, ts INTEGER,"
+        " open REAL, high REAL, low REAL, close REAL, volume REAL,"
+        " PRIMARY KEY (symbol, interval, ts))"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS meta ("
+        " symbol TEXT, interval TEXT, tz TEXT, covered_from INTEGER, refreshed_at REAL,"
+        " PRIMARY KEY (symbol, interval))"
+    )
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def get_meta(symbol: str, interval: str) -> dict | None:
+    """Cache metadata: tz, covered_from (epoch s of earliest window downloaded), refreshed_at (epoch s)."""
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT tz, covered_from, refreshed_at FROM meta WHERE symbol = ? AND interval = ?",
+            (symbol, interval),
+        ).fetchone()
+    if row is None:
+        return None
+    return {"tz": row[0], "covered_from": row[1], "refreshed_at": row[2]}
+
+
+def last_timestamp(symbol: str, interval: str) -> pd.Timestamp | None:
+    """Timestamp (UTC) of the newest stored bar, or None if nothing is stored."""
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT MAX(ts) FROM bars WHERE symbol = ? AND interval = ?", (symbol, interval)
+        ).fetchone()
+    if row is None or row[0] is None:
+        return None
+    return pd.Timestamp(row[0], unit="s", tz="UTC")
+
+
+def load_bars(symbol: str, interval: str, start: pd.Timestamp | None = None) -> pd.DataFrame | None:
+    """Stored bars for symbol/interval (from start if given), indexed by timestamp in the symbol's tz."""
+    meta = get_meta(symbol, interval)
+    if meta is None:
+        return None
+    sql = "SELECT ts, open, high, low, close, volume FROM bars WHERE symbol = ? AND interval = ?"
+    params: list = [symbol, interval]
+    if start is not None:
+        sql += " AND ts >= ?"
+        params.append(int(start.timestamp()))
+    sql += " ORDER BY ts"
+    with _connect() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    if not rows:
+        return None
+    df = pd.DataFrame(rows, columns=["ts"] + OHLCV_COLUMNS)
+    index = pd.to_datetime(df.pop("ts"), unit="s", utc=True)
+    if meta["tz"]:
+        index = index.dt.tz_convert(meta["tz"])
+    df.index = pd.DatetimeIndex(index, name="Date")
+    return df
+
+
+def store_bars(symbol: str, interval: str, df: pd.DataFrame, covered_from: pd.Timestamp | None = None) -> None:
+    """
+    Upsert bars (a re-downloaded bar replaces the stored one, e.g. today's still-forming daily bar)
+    and mark the cache as refreshed now. covered_from extends the known-complete history window.
+    """
+    index = df.index
+    tz = str(index.tz) if index.tz is not None else ""
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    ts = index.tz_convert("UTC").as_unit("s").asi8.tolist()
+    values = df[OHLCV_COLUMNS].astype(float).to_numpy().tolist()
+    rows = [(symbol, interval, t, *v) for t, v in zip(ts, values)]
+    covered = int(covered_from.timestamp()) if covered_from is not None else (ts[0] if ts else None)
+    with _connect() as conn:
+        conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        prev = conn.execute(
+            "SELECT covered_from FROM meta WHERE symbol = ? AND interval = ?", (symbol, interval)
+        ).fetchone()
+        if prev is not None and prev[0] is not None and (covered is None or prev[0] < covered):
+            covered = prev[0]
+        conn.execute(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?, ?, ?, ?)",
+            (symbol, interval, tz, covered, time.time()),
+        )
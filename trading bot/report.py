@@ -0,0 +1,226 @@
+"""
+Backtest performance report: per-trade P&L in contract terms (futures multipliers), win rate,
+profit factor, expectancy (USD and R), drawdown, Sharpe/Sortino, exposure and monthly returns.
+All metrics are vectorized over the trades table (tens of milliseconds for 100k trades).
+Used by: python backtest.py --report DIR
+"""
+
+import html
+from importlib.util import find_spec
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from config import INITIAL_BALANCE, FIXED_CONTRACTS, get_multiplier
+from params import StrategyParams, DEFAULT_PARAMS
+
+TRADING_DAYS_PER_YEAR = 252
+TRADE_COLUMNS = ["symbol", "entry_date", "exit_date", "entry_price", "exit_price", "reason"]
+PARQUET_ENGINES = ("pyarrow", "fastparquet")  # optional: pip install pyarrow (either engine works for pandas)
+
+
+def trades_frame(
+    all_trades: dict,
+    frames: dict[str, pd.DataFrame] | None = None,
+    params: StrategyParams | None = None,
+    contracts: int | None = None,
+) -> pd.DataFrame:
+    """
+    One row per trade from run_backtest output (symbol -> [(entry_date, exit_date, entry_price, exit_price, reason)]).
+    contracts per trade: FIXED_CONTRACTS for the symbol, as the paper trader opens (1 if it has none), unless given.
+    Adds contracts, pnl (USD = contracts × (exit − entry) × multiplier), return_pct and, when the price
+    frames are given, risk (entry − SL, from params.sl_tp_distances like the backtest) and r_multiple.
+    """
+    p = params or DEFAULT_PARAMS
+    parts = []
+    for symbol, trades in all_trades.items():
+        if not trades:
+            continue
+        entry_date, exit_date, entry_price, exit_price, reason = zip(*trades)
+        entry_date, exit_date = pd.DatetimeIndex(entry_date), pd.DatetimeIndex(exit_date)
+        entry = np.asarray(entry_price, dtype=float)
+        exit_ = np.asarray(exit_price, dtype=float)
+        size = contracts if contracts is not None else FIXED_CONTRACTS.get(symbol, 1)
+        risk = np.full(len(entry), np.nan)
+        if frames is not None and frames.get(symbol) is not None:
+            df = frames[symbol]
+            rows = df.index.get_indexer(entry_date)
+            found = rows >= 0
+            risk[found] = p.sl_tp_distances(symbol, df)["risk"].to_numpy()[rows[found]]
+        elif p.ticks_for(symbol) is not None:
+            risk[:] = p.fixed_sl_tp(symbol)[0]
+        parts.append(pd.DataFrame({
+            "symbol": symbol,
+            "entry_date": entry_date,
+            "exit_date": exit_date,
+            "entry_price": entry,
+            "exit_price": exit_,
+            "reason": np.asarray(reason),
+            "contracts": size,
+            "pnl": size * (exit_ - entry) * get_multiplier(symbol),
+            "return_pct": exit_ / entry - 1,
+            "risk": risk,
+            "r_multiple": (exit_ - entry) / risk,
+        }))
+    if not parts:
+        cols = TRADE_COLUMNS + ["contracts", "pnl", "return_pct", "risk", "r_multiple"]
+        return pd.DataFrame(columns=cols)
+    return pd.concat(parts, ignore_index=True).sort_values("exit_date", kind="stable", ignore_index=True)
+
+
+def equity_curve(trades: pd.DataFrame, initial_balance: float = INITIAL_BALANCE) -> pd.Series:
+    """Account equity after each trading day (P&L booked at exit), forward-filled over business days."""
+    if trades.empty:
+        return pd.Series(dtype=float, name="equity")
+    exits = pd.DatetimeIndex(trades["exit_date"])
+    if exits.tz is not None:
+        exits = exits.tz_localize(None)
+    entries = pd.DatetimeIndex(trades["entry_date"])
+    if entries.tz is not None:
+        entries = entries.tz_localize(None)
+    daily_pnl = pd.Series(trades["pnl"].to_numpy(), index=exits.normalize()).groupby(level=0).sum()
+    days = pd.date_range(min(entries.min(), exits.min()).normalize(), daily_pnl.index.max(), freq="D")
+    days = days[days.dayofweek < 5].union(daily_pnl.index)
+    equity = initial_balance + daily_pnl.reindex(days, fill_value=0.0).cumsum()
+    equity.name = "equity"
+    return equity
+
+
+def _exposure(trades: pd.DataFrame) -> float:
+    """Fraction of the backtest span with at least one open position (union of holding periods)."""
+    if trades.empty:
+        return 0.0
+    start = pd.DatetimeIndex(trades["entry_date"]).asi8
+    end = pd.DatetimeIndex(trades["exit_date"]).asi8
+    order = np.argsort(start, kind="stable")
+    start, end = start[order], end[order]
+    reach = np.maximum.accumulate(end)
+    prev = np.concatenate(([start[0]], reach[:-1]))
+    covered = np.clip(end - np.maximum(start, prev), 0, None).sum()
+    span = reach[-1] - start[0]
+    return float(covered / span) if span > 0 else 1.0
+
+
+def monthly_returns(equity: pd.Series, initial_balance: float = INITIAL_BALANCE) -> pd.DataFrame:
+    """Month-over-month return of the equity curve as a year × month table."""
+    if equity.empty:
+        return pd.DataFrame()
+    month_end = equity.resample("ME").last()
+    returns = month_end / month_end.shift(1, fill_value=initial_balance) - 1
+    table = pd.DataFrame({"year": returns.index.year, "month": returns.index.month, "ret": returns.to_numpy()})
+    return table.pivot(index="year", columns="month", values="ret")
+
+
+def summarize(trades: pd.DataFrame, equity: pd.Series, initial_balance: float = INITIAL_BALANCE) -> dict:
+    """Headline metrics for a trades table and its equity curve."""
+    n = len(trades)
+    if n == 0:
+        return {"trades": 0}
+    pnl = trades["pnl"].to_numpy()
+    gross_profit = pnl[pnl > 0].sum()
+    gross_loss = -pnl[pnl < 0].sum()
+    drawdown = equity / equity.cummax() - 1
+    daily = equity.pct_change().dropna()
+    downside = np.sqrt(np.mean(np.minimum(daily.to_numpy(), 0.0) ** 2)) if len(daily) else 0.0
+    std = daily.std()
+    annual = np.sqrt(TRADING_DAYS_PER_YEAR)
+    held = pd.to_datetime(trades["exit_date"]) - pd.to_datetime(trades["entry_date"])
+    return {
+        "trades": n,
+        "win_rate": float((pnl > 0).mean()),
+        "total_pnl": float(pnl.sum()),
+        "total_return": float(equity.iloc[-1] / initial_balance - 1),
+        "profit_factor": float(gross_profit / gross_loss) if gross_loss > 0 else float("inf"),
+        "avg_win": float(pnl[pnl > 0].mean()) if (pnl > 0).any() else 0.0,
+        "avg_loss": float(pnl[pnl < 0].mean()) if (pnl < 0).any() else 0.0,
+        "expectancy": float(pnl.mean()),
+        "expectancy_r": float(trades["r_multiple"].mean()),
+        "max_drawdown": float(-drawdown.min()),
+        "max_drawdown_usd": float(-(equity - equity.cummax()).min()),
+        "sharpe": float(daily.mean() / std * annual) if std > 0 else 0.0,
+        "sortino": float(daily.mean() / downside * annual) if downside > 0 else 0.0,
+        "exposure": _exposure(trades),
+        "avg_holding_days": float(held.mean() / pd.Timedelta(days=1)),
+    }
+
+
+def build_report(
+    all_trades: dict,
+    frames: dict[str, pd.DataFrame] | None = None,
+    params: StrategyParams | None = None,
+    initial_balance: float = INITIAL_BALANCE,
+) -> dict:
+    """trades, equity, monthly and summary for a run_backtest result."""
+    trades = trades_frame(all_trades, frames, params)
+    equity = equity_curve(trades, initial_balance)
+    return {
+        "trades": trades,
+        "equity": equity,
+        "monthly": monthly_returns(equity, initial_balance),
+        "summary": summarize(trades, equity, initial_balance),
+    }
+
+
+def _equity_svg(equity: pd.Series, width: int = 800, height: int = 240) -> str:
+    """Inline SVG line chart of the equity curve (no plotting dependency)."""
+    if len(equity) < 2:
+        return ""
+    values = equity.to_numpy(dtype=float)
+    lo, hi = values.min(), values.max()
+    ys = height - (values - lo) / ((hi - lo) or 1.0) * height
+    xs = np.linspace(0, width, len(values))
+    points = " ".join(f"{x:.1f},{y:.1f}" for x, y in zip(xs, ys))
+    return (
+        f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+        f'<polyline fill="none" stroke="#1f77b4" stroke-width="1.5" points="{points}"/></svg>'
+        f"<p>{equity.index[0]:%Y-%m-%d} → {equity.index[-1]:%Y-%m-%d}: ${lo:,.0f} – ${hi:,.0f}</p>"
+    )
+
+
+def parquet_available() -> bool:
+    """True if pandas has a Parquet engine (pyarrow or fastparquet) installed."""
+    return any(find_spec(engine) is not None for engine in PARQUET_ENGINES)
+
+
+def write_report(report: dict, out_dir: str | Path, fmt: str = "csv") -> Path:
+    """
+    Write trades / equity / monthly / summary tables (csv, or parquet which needs pyarrow)
+    and a static report.html to out_dir. Returns the HTML path. Raises ImportError for parquet
+    without an engine, before anything is written.
+    """
+    if fmt == "parquet" and not parquet_available():
+        raise ImportError("Parquet output needs pyarrow (pip install pyarrow) or fastparquet")
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    summary = pd.DataFrame([report["summary"]])
+    tables = {
+        "trades": report["trades"],
+        "equity": report["equity"].to_frame(),
+        "monthly": report["monthly"],
+        "summary": summary,
+    }
+    for name, table in tables.items():
+        if fmt == "parquet":
+            table.set_axis(table.columns.map(str), axis=1).to_parquet(out / f"{name}.parquet")
+        else:
+            table.to_csv(out / f"{name}.csv", index=name != "trades" and name != "summary")
+
+    by_symbol = report["trades"].groupby("symbol").agg(
+        trades=("pnl", "size"), win_rate=("pnl", lambda x: (x > 0).mean()), pnl=("pnl", "sum"),
+    ) if not report["trades"].empty else pd.DataFrame()
+    monthly = report["monthly"].map(lambda v: "" if pd.isna(v) else f"{v:+.2%}")
+    page = "\n".join([
+        "<!doctype html><html><head><meta charset='utf-8'><title>Backtest report</title>",
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+        "td,th{border:1px solid #ccc;padding:2px 8px;text-align:right}</style></head><body>",
+        "<h1>Backtest report</h1>",
+        "<h2>Summary</h2>", summary.T.rename(columns={0: "value"}).to_html(float_format=lambda v: f"{v:,.4f}"),
+        "<h2>Equity</h2>", _equity_svg(report["equity"]),
+        "<h2>Monthly returns</h2>", monthly.to_html(),
+        "<h2>By symbol</h2>", by_symbol.to_html(float_format=lambda v: f"{v:,.2f}"),
+        f"<p>{html.escape(str(len(report['trades'])))} trades; full list in trades.{fmt}.</p>",
+        "</body></html>",
+    ])
+    path = out / "report.html"
+    path.write_text(page, encoding="utf-8")
+    return path
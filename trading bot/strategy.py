@@ -7,43 +7,19 @@ Uses:
 - News: keyword-based sentiment
 """
 
+from collections import OrderedDict
 import pandas as pd
+import kernels
 from config import (
-    VOLUME_AVG_DAYS,
-    VOLUME_MIN_RATIO,
-    OBV_MA_PERIOD,
-    ROC_PERIOD,
-    ROC_BUY_MIN,
-    ROC_SELL_MAX,
-    BB_PERIOD,
-    BB_STD,
-    REQUIRE_ABOVE_LOWER_BAND,
-    USE_RSI,
-    RSI_PERIOD,
-    RSI_OVERBOUGHT,
-    RSI_OVERSOLD,
-    USE_MACD,
-    MACD_FAST,
-    MACD_SLOW,
-    MACD_SIGNAL,
-    USE_ADX,
-    ADX_PERIOD,
-    ADX_MIN,
-    USE_MFI,
-    MFI_PERIOD,
-    MFI_OVERBOUGHT,
-    MFI_OVERSOLD,
-    USE_STOCHASTIC,
-    STOCH_K_PERIOD,
-    STOCH_D_PERIOD,
-    STOCH_OVERBOUGHT,
-    STOCH_OVERSOLD,
-    USE_ZSCORE,
-    ZSCORE_PERIOD,
-    ZSCORE_BUY_MAX,
-    ZSCORE_SELL_EXTREME,
+    INDICATOR_CACHE_SIZE,
+    INDICATOR_CACHE_WARMUP_BARS,
+    INDICATOR_BACKEND,
+    NEWS_SENTIMENT_BUY_MIN,
+    NEWS_SENTIMENT_SELL_MAX,
 )
-from data import get_prices
+from data import get_prices, closed_bars, MarketSnapshot
+from params import StrategyParams, DEFAULT_PARAMS
+from volatility import true_range_array
 from news import news_allows_buy, news_suggests_sell
 
 
@@ -86,17 +62,13 @@ def _macd(close: pd.Series, fast: int, slow: int, signal: int):
     return macd_line, signal_line
 
 
-def _adx(high: pd.Series, low: pd.Series, close: pd.Series, period: int) -> pd.Series:
-    """Average Directional Index: trend strength (0–100). >20 = trending."""
+def _adx_pandas(high: pd.Series, low: pd.Series, close: pd.Series, period: int) -> pd.Series:
+    """Average Directional Index: trend strength (0–100). >20 = trending. Reference pandas version."""
     plus_dm = high.diff()
     minus_dm = -low.diff()
     plus_dm = plus_dm.where((plus_dm > minus_dm) & (plus_dm > 0), 0.0)
     minus_dm = minus_dm.where((minus_dm > plus_dm) & (minus_dm > 0), 0.0)
-    tr = pd.concat([
-        high - low,
-        (high - close.shift(1)).abs(),
-        (low - close.shift(1)).abs(),
-    ], axis=1).max(axis=1)
+    tr = pd.Series(true_range_array(high, low, close), index=close.index)
     atr = tr.rolling(period).mean().replace(0, pd.NA)
     plus_di = 100 * (plus_dm.rolling(period).mean() / atr)
     minus_di = 100 * (minus_dm.rolling(period).mean() / atr)
@@ -106,8 +78,8 @@ def _adx(high: pd.Series, low: pd.Series, close: pd.Series, period: int) -> pd.S
     return adx
 
 
-def _mfi(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series, period: int) -> pd.Series:
-    """Money Flow Index (0–100). Volume-weighted momentum; overbought > 80, oversold < 20."""
+def _mfi_pandas(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series, period: int) -> pd.Series:
+    """Money Flow Index (0–100). Volume-weighted momentum; overbought > 80, oversold < 20. Reference pandas version."""
     typical = (high + low + close) / 3
     raw_money_flow = typical * volume
     up = typical > typical.shift(1)
@@ -119,6 +91,45 @@ def _mfi(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series, p
     return mfi.fillna(50)
 
 
+def _adx(
+    high: pd.Series, low: pd.Series, close: pd.Series, period: int, backend: str = INDICATOR_BACKEND
+) -> pd.Series:
+    """ADX via the configured backend: "pandas" (reference) or the NumPy/Numba kernels."""
+    if backend == "pandas":
+        return _adx_pandas(high, low, close, period)
+    return pd.Series(kernels.adx(high, low, close, period, backend), index=close.index)
+
+
+def _mfi(
+    high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series, period: int,
+    backend: str = INDICATOR_BACKEND,
+) -> pd.Series:
+    """MFI via the configured backend: "pandas" (reference) or the NumPy/Numba kernels."""
+    if backend == "pandas":
+        return _mfi_pandas(high, low, close, volume, period)
+    return pd.Series(kernels.mfi(high, low, close, volume, period, backend), index=close.index)
+
+
+def verify_backends(df: pd.DataFrame, params: StrategyParams | None = None, backend: str = INDICATOR_BACKEND) -> dict:
+    """Largest absolute difference between backend and pandas ADX / MFI over df (NaN positions must match too)."""
+    p = params or DEFAULT_PARAMS
+    high, low, close, volume = df["High"], df["Low"], df["Close"], df["Volume"]
+    pairs = {
+        "adx": (_adx_pandas(high, low, close, p.adx_period), _adx(high, low, close, p.adx_period, backend)),
+        "mfi": (_mfi_pandas(high, low, close, volume, p.mfi_period),
+                _mfi(high, low, close, volume, p.mfi_period, backend)),
+    }
+    diffs = {}
+    for name, (ref, fast) in pairs.items():
+        ref, fast = _as_float(ref).to_numpy(), fast.to_numpy()
+        if (pd.isna(ref) != pd.isna(fast)).any():
+            diffs[name] = float("inf")
+        else:
+            both = ~pd.isna(ref)
+            diffs[name] = float(abs(ref[both] - fast[both]).max()) if both.any() else 0.0
+    return diffs
+
+
 def _stochastic(high: pd.Series, low: pd.Series, close: pd.Series, k_period: int, d_period: int):
     """Stochastic %K and %D (0–100). Overbought > 80, oversold < 20."""
     lowest_low = low.rolling(k_period).min()
@@ -137,24 +148,24 @@ def _zscore(close: pd.Series, period: int) -> pd.Series:
     return z
 
 
-def _lookback() -> int:
+def _lookback(params: StrategyParams | None = None) -> int:
     """Minimum bars needed for all indicators."""
-    return max(
-        VOLUME_AVG_DAYS, OBV_MA_PERIOD, ROC_PERIOD, BB_PERIOD,
-        RSI_PERIOD + 2 if USE_RSI else 0,
-        MACD_SLOW + MACD_SIGNAL + 2 if USE_MACD else 0,
-        ADX_PERIOD + 2 if USE_ADX else 0,
-        MFI_PERIOD + 2 if USE_MFI else 0,
-        STOCH_K_PERIOD + STOCH_D_PERIOD + 2 if USE_STOCHASTIC else 0,
-        ZSCORE_PERIOD + 2 if USE_ZSCORE else 0,
-    ) + 2
-
-
-def get_signals_from_df(symbol: str, df: pd.DataFrame, use_news: bool = True) -> str:
+    return (params or DEFAULT_PARAMS).lookback()
+
+
+def get_signals_from_df(
+    symbol: str,
+    df: pd.DataFrame,
+    use_news: bool = True,
+    params: StrategyParams | None = None,
+    news: dict | None = None,
+) -> str:
     """
     Same as get_signals but uses provided df (for backtest). use_news=False skips news checks.
+    params defaults to DEFAULT_PARAMS (config.py); news is prefetched sentiment as in signal_from_frame.
     """
-    lookback = _lookback()
+    p = params or DEFAULT_PARAMS
+    lookback = p.lookback()
     if df is None or len(df) < lookback:
         return "HOLD"
 
@@ -164,42 +175,42 @@ def get_signals_from_df(symbol: str, df: pd.DataFrame, use_news: bool = True) ->
     low = df["Low"]
 
     # --- Volume ---
-    vol_avg = volume.rolling(VOLUME_AVG_DAYS).mean()
+    vol_avg = volume.rolling(p.volume_avg_days).mean()
     vol_ratio = volume / vol_avg
     current_vol_ratio = vol_ratio.iloc[-1]
-    if pd.isna(current_vol_ratio) or current_vol_ratio < VOLUME_MIN_RATIO:
+    if pd.isna(current_vol_ratio) or current_vol_ratio < p.volume_min_ratio:
         return "HOLD"
 
     obv = _obv(df)
-    obv_ma = obv.rolling(OBV_MA_PERIOD).mean()
+    obv_ma = obv.rolling(p.obv_ma_period).mean()
     obv_up = obv.iloc[-1] > obv_ma.iloc[-1]
     obv_down = obv.iloc[-1] < obv_ma.iloc[-1]
 
     # --- Math: momentum (ROC) ---
-    roc = (close - close.shift(ROC_PERIOD)) / close.shift(ROC_PERIOD)
+    roc = (close - close.shift(p.roc_period)) / close.shift(p.roc_period)
     current_roc = roc.iloc[-1]
     if pd.isna(current_roc):
         return "HOLD"
 
     # --- Math: Bollinger (volatility) ---
-    lower_bb, _, upper_bb = _bollinger_bands(close, BB_PERIOD, BB_STD)
+    lower_bb, _, upper_bb = _bollinger_bands(close, p.bb_period, p.bb_std)
     above_lower = close.iloc[-1] > lower_bb.iloc[-1] if not pd.isna(lower_bb.iloc[-1]) else True
 
     # --- Math: RSI (overbought/oversold) ---
     rsi_ok_buy = True
     rsi_sell = False
-    if USE_RSI:
-        rsi = _rsi(close, RSI_PERIOD)
+    if p.use_rsi:
+        rsi = _rsi(close, p.rsi_period)
         current_rsi = rsi.iloc[-1]
         if not pd.isna(current_rsi):
-            rsi_ok_buy = RSI_OVERSOLD < current_rsi < RSI_OVERBOUGHT  # don't buy at extremes
-            rsi_sell = current_rsi >= RSI_OVERBOUGHT or current_rsi <= RSI_OVERSOLD
+            rsi_ok_buy = p.rsi_oversold < current_rsi < p.rsi_overbought  # don't buy at extremes
+            rsi_sell = current_rsi >= p.rsi_overbought or current_rsi <= p.rsi_oversold
 
     # --- Math: MACD (trend confirmation) ---
     macd_ok_buy = True
     macd_sell = False
-    if USE_MACD:
-        macd_line, signal_line = _macd(close, MACD_FAST, MACD_SLOW, MACD_SIGNAL)
+    if p.use_macd:
+        macd_line, signal_line = _macd(close, p.macd_fast, p.macd_slow, p.macd_signal)
         curr_macd = macd_line.iloc[-1]
         curr_sig = signal_line.iloc[-1]
         prev_macd = macd_line.iloc[-2]
@@ -210,47 +221,47 @@ def get_signals_from_df(symbol: str, df: pd.DataFrame, use_news: bool = True) ->
 
     # --- Math: ADX (trend strength – avoid chop) ---
     adx_ok_buy = True
-    if USE_ADX:
-        adx = _adx(high, low, close, ADX_PERIOD)
+    if p.use_adx:
+        adx = _adx(high, low, close, p.adx_period)
         current_adx = adx.iloc[-1]
         if not pd.isna(current_adx):
-            adx_ok_buy = current_adx > ADX_MIN
+            adx_ok_buy = current_adx > p.adx_min
 
     # --- Math: MFI (volume-weighted momentum) ---
     mfi_ok_buy = True
     mfi_sell = False
-    if USE_MFI:
-        mfi = _mfi(high, low, close, volume, MFI_PERIOD)
+    if p.use_mfi:
+        mfi = _mfi(high, low, close, volume, p.mfi_period)
         current_mfi = mfi.iloc[-1]
         if not pd.isna(current_mfi):
-            mfi_ok_buy = MFI_OVERSOLD < current_mfi < MFI_OVERBOUGHT
-            mfi_sell = current_mfi >= MFI_OVERBOUGHT or current_mfi <= MFI_OVERSOLD
+            mfi_ok_buy = p.mfi_oversold < current_mfi < p.mfi_overbought
+            mfi_sell = current_mfi >= p.mfi_overbought or current_mfi <= p.mfi_oversold
 
     # --- Math: Stochastic (overbought/oversold) ---
     stoch_ok_buy = True
     stoch_sell = False
-    if USE_STOCHASTIC:
-        stoch_k, stoch_d = _stochastic(high, low, close, STOCH_K_PERIOD, STOCH_D_PERIOD)
+    if p.use_stochastic:
+        stoch_k, stoch_d = _stochastic(high, low, close, p.stoch_k_period, p.stoch_d_period)
         current_k = stoch_k.iloc[-1]
         if not pd.isna(current_k):
-            stoch_ok_buy = STOCH_OVERSOLD < current_k < STOCH_OVERBOUGHT
-            stoch_sell = current_k >= STOCH_OVERBOUGHT or current_k <= STOCH_OVERSOLD
+            stoch_ok_buy = p.stoch_oversold < current_k < p.stoch_overbought
+            stoch_sell = current_k >= p.stoch_overbought or current_k <= p.stoch_oversold
 
     # --- Math: Z-Score (price extremes) ---
     zscore_ok_buy = True
     zscore_sell = False
-    if USE_ZSCORE:
-        z = _zscore(close, ZSCORE_PERIOD)
+    if p.use_zscore:
+        z = _zscore(close, p.zscore_period)
         current_z = z.iloc[-1]
         if not pd.isna(current_z):
-            zscore_ok_buy = current_z <= ZSCORE_BUY_MAX  # don't chase extended price
-            zscore_sell = abs(current_z) > ZSCORE_SELL_EXTREME  # take profit or cut loss
+            zscore_ok_buy = current_z <= p.zscore_buy_max  # don't chase extended price
+            zscore_sell = abs(current_z) > p.zscore_sell_extreme  # take profit or cut loss
 
     # BUY: volume + OBV + momentum + Bollinger + RSI + MACD + ADX + MFI + Stochastic + Z-Score + news
     if (
-        current_vol_ratio >= VOLUME_MIN_RATIO
+        current_vol_ratio >= p.volume_min_ratio
         and obv_up
-        and current_roc >= ROC_BUY_MIN
+        and current_roc >= p.roc_buy_min
         and rsi_ok_buy
         and macd_ok_buy
         and adx_ok_buy
@@ -258,29 +269,272 @@ def get_signals_from_df(symbol: str, df: pd.DataFrame, use_news: bool = True) ->
         and stoch_ok_buy
         and zscore_ok_buy
     ):
-        if use_news and not news_allows_buy(symbol):
+        if use_news and not news_allows_buy(symbol, news):
             return "HOLD"
-        if REQUIRE_ABOVE_LOWER_BAND and not above_lower:
+        if p.require_above_lower_band and not above_lower:
             return "HOLD"
         return "BUY"
 
     # SELL: volume and (OBV down or ROC negative or RSI/MFI/Stoch extreme or MACD bearish or Z-Score extreme or news)
-    if current_vol_ratio >= VOLUME_MIN_RATIO and (
+    if current_vol_ratio >= p.volume_min_ratio and (
         obv_down
-        or current_roc <= ROC_SELL_MAX
+        or current_roc <= p.roc_sell_max
         or rsi_sell
         or macd_sell
         or mfi_sell
         or stoch_sell
         or zscore_sell
-        or (use_news and news_suggests_sell(symbol))
+        or (use_news and news_suggests_sell(symbol, news))
     ):
         return "SELL"
 
     return "HOLD"
 
 
-def get_signals(symbol: str) -> str:
-    """Live signal: fetches data and returns BUY/SELL/HOLD."""
-    df = get_prices(symbol)
-    return get_signals_from_df(symbol, df, use_news=True)
+def _as_float(s: pd.Series) -> pd.Series:
+    """Indicator series as float64 (pd.NA from .replace(0, pd.NA) becomes NaN)."""
+    return pd.to_numeric(s, errors="coerce").astype("float64")
+
+
+def compute_signal_frame(df: pd.DataFrame, params: StrategyParams | None = None) -> pd.DataFrame:
+    """
+    Every indicator and gate for every bar of df in one vectorized pass (news off).
+    One column per gate (vol_ratio, obv_up, roc, rsi_ok_buy, macd_sell, adx_ok_buy, mfi, stoch_k, zscore, ...)
+    plus "active" (volume/ROC/lookback gate passed), "buy_setup", "sell_setup" and the final "signal".
+    Row i gives the same signal as get_signals_from_df(symbol, df.iloc[: i + 1], use_news=False):
+    every indicator is causal, so computing it once over the full frame equals computing it per prefix.
+    params defaults to DEFAULT_PARAMS (config.py).
+    """
+    p = params or DEFAULT_PARAMS
+    if df is None:
+        return pd.DataFrame(columns=["signal"])
+    index = df.index
+    close = df["Close"]
+    volume = df["Volume"]
+    high = df["High"]
+    low = df["Low"]
+    true_ = pd.Series(True, index=index)
+    false_ = pd.Series(False, index=index)
+    nan_ = pd.Series(float("nan"), index=index)
+    frame = pd.DataFrame(index=index)
+
+    # --- Volume ---
+    frame["vol_ratio"] = _as_float(volume / volume.rolling(p.volume_avg_days).mean())
+    obv = _obv(df)
+    obv_ma = obv.rolling(p.obv_ma_period).mean()
+    frame["obv_up"] = obv > obv_ma
+    frame["obv_down"] = obv < obv_ma
+
+    # --- Math: momentum (ROC) ---
+    frame["roc"] = _as_float((close - close.shift(p.roc_period)) / close.shift(p.roc_period))
+
+    # --- Math: Bollinger (volatility) ---
+    lower_bb, _, _ = _bollinger_bands(close, p.bb_period, p.bb_std)
+    frame["above_lower"] = (close > lower_bb) | lower_bb.isna()
+
+    # --- Math: RSI (overbought/oversold); a missing value never blocks BUY nor forces SELL ---
+    frame["rsi"], frame["rsi_ok_buy"], frame["rsi_sell"] = nan_, true_, false_
+    if p.use_rsi:
+        rsi = _as_float(_rsi(close, p.rsi_period))
+        frame["rsi"] = rsi
+        frame["rsi_ok_buy"] = ((rsi > p.rsi_oversold) & (rsi < p.rsi_overbought)) | rsi.isna()
+        frame["rsi_sell"] = (rsi >= p.rsi_overbought) | (rsi <= p.rsi_oversold)
+
+    # --- Math: MACD (trend confirmation) ---
+    frame["macd"], frame["macd_signal"] = nan_, nan_
+    frame["macd_ok_buy"], frame["macd_sell"] = true_, false_
+    if p.use_macd:
+        macd_line, signal_line = _macd(close, p.macd_fast, p.macd_slow, p.macd_signal)
+        frame["macd"], frame["macd_signal"] = macd_line, signal_line
+        frame["macd_ok_buy"] = (macd_line > signal_line) | macd_line.isna() | signal_line.isna()
+        frame["macd_sell"] = macd_line < signal_line
+
+    # --- Math: ADX (trend strength – avoid chop) ---
+    frame["adx"], frame["adx_ok_buy"] = nan_, true_
+    if p.use_adx:
+        adx = _as_float(_adx(high, low, close, p.adx_period))
+        frame["adx"] = adx
+        frame["adx_ok_buy"] = (adx > p.adx_min) | adx.isna()
+
+    # --- Math: MFI (volume-weighted momentum) ---
+    frame["mfi"], frame["mfi_ok_buy"], frame["mfi_sell"] = nan_, true_, false_
+    if p.use_mfi:
+        mfi = _as_float(_mfi(high, low, close, volume, p.mfi_period))
+        frame["mfi"] = mfi
+        frame["mfi_ok_buy"] = ((mfi > p.mfi_oversold) & (mfi < p.mfi_overbought)) | mfi.isna()
+        frame["mfi_sell"] = (mfi >= p.mfi_overbought) | (mfi <= p.mfi_oversold)
+
+    # --- Math: Stochastic (overbought/oversold) ---
+    frame["stoch_k"], frame["stoch_ok_buy"], frame["stoch_sell"] = nan_, true_, false_
+    if p.use_stochastic:
+        stoch_k, _ = _stochastic(high, low, close, p.stoch_k_period, p.stoch_d_period)
+        stoch_k = _as_float(stoch_k)
+        frame["stoch_k"] = stoch_k
+        frame["stoch_ok_buy"] = ((stoch_k > p.stoch_oversold) & (stoch_k < p.stoch_overbought)) | stoch_k.isna()
+        frame["stoch_sell"] = (stoch_k >= p.stoch_overbought) | (stoch_k <= p.stoch_oversold)
+
+    # --- Math: Z-Score (price extremes) ---
+    frame["zscore"], frame["zscore_ok_buy"], frame["zscore_sell"] = nan_, true_, false_
+    if p.use_zscore:
+        z = _as_float(_zscore(close, p.zscore_period))
+        frame["zscore"] = z
+        frame["zscore_ok_buy"] = (z <= p.zscore_buy_max) | z.isna()
+        frame["zscore_sell"] = z.abs() > p.zscore_sell_extreme
+
+    vol_ratio = frame["vol_ratio"]
+    roc = frame["roc"]
+    enough_bars = pd.Series(range(len(df)), index=index) >= p.lookback() - 1
+    frame["active"] = enough_bars & (vol_ratio >= p.volume_min_ratio) & roc.notna()
+    frame["buy_setup"] = (
+        frame["active"]
+        & frame["obv_up"]
+        & (roc >= p.roc_buy_min)
+        & frame["rsi_ok_buy"]
+        & frame["macd_ok_buy"]
+        & frame["adx_ok_buy"]
+        & frame["mfi_ok_buy"]
+        & frame["stoch_ok_buy"]
+        & frame["zscore_ok_buy"]
+    )
+    frame["sell_setup"] = frame["active"] & ~frame["buy_setup"] & (
+        frame["obv_down"]
+        | (roc <= p.roc_sell_max)
+        | frame["rsi_sell"]
+        | frame["macd_sell"]
+        | frame["mfi_sell"]
+        | frame["stoch_sell"]
+        | frame["zscore_sell"]
+    )
+    # A BUY setup blocked by the Bollinger filter is HOLD, not SELL (same as get_signals_from_df)
+    buy = frame["buy_setup"]
+    if p.require_above_lower_band:
+        buy = buy & frame["above_lower"]
+    signal = pd.Series("HOLD", index=index, dtype=object)
+    signal[buy] = "BUY"
+    signal[frame["sell_setup"]] = "SELL"
+    frame["signal"] = signal
+    return frame
+
+
+def apply_news_gate(frame: pd.DataFrame, sentiment: pd.Series) -> pd.Series:
+    """
+    frame["signal"] with the news gate of signal_from_frame applied bar by bar. sentiment is aligned
+    to the frame (e.g. news.sentiment_asof); NaN means no news, which neither blocks BUY nor adds SELL.
+    """
+    sentiment = pd.Series(sentiment, index=frame.index, dtype="float64")
+    signal = frame["signal"].copy()
+    signal[(signal == "BUY") & (sentiment < NEWS_SENTIMENT_BUY_MIN)] = "HOLD"
+    news_sell = (signal == "HOLD") & frame["active"] & ~frame["buy_setup"] & (sentiment <= NEWS_SENTIMENT_SELL_MAX)
+    signal[news_sell] = "SELL"
+    return signal
+
+
+def get_signal_series(
+    df: pd.DataFrame,
+    params: StrategyParams | None = None,
+    sentiment: pd.Series | None = None,
+) -> pd.Series:
+    """BUY/SELL/HOLD for every bar of df. See compute_signal_frame; sentiment (per bar) applies the news gate."""
+    frame = compute_signal_frame(df, params)
+    if sentiment is None:
+        return frame["signal"]
+    return apply_news_gate(frame, sentiment)
+
+
+# (symbol, params) -> (signal frame, fingerprints of its last two source bars); least recently used first
+_FRAME_CACHE: OrderedDict = OrderedDict()
+_BAR_COLUMNS = ["High", "Low", "Close", "Volume"]
+
+
+def _bar_fingerprint(df: pd.DataFrame, pos: int) -> tuple:
+    return tuple(float(v) for v in df[_BAR_COLUMNS].iloc[pos])
+
+
+def clear_indicator_cache() -> None:
+    _FRAME_CACHE.clear()
+
+
+def cached_signal_frame(symbol: str, df: pd.DataFrame, params: StrategyParams | None = None) -> pd.DataFrame:
+    """
+    compute_signal_frame with an LRU cache keyed on (symbol, params) and the last bar seen.
+    Same bars as last time -> cached frame, no computation. Bars appended (or the still-forming
+    last bar revised) -> only the new rows are computed, on a warm-up tail of
+    INDICATOR_CACHE_WARMUP_BARS; rows already computed are reused. Anything else -> full compute.
+    Reused rows keep values from the history they were computed on, so after the fetch window slides
+    they may differ from a fresh compute in its warm-up rows; the latest rows match to float noise.
+    """
+    p = params or DEFAULT_PARAMS
+    if df is None or len(df) < p.lookback() or INDICATOR_CACHE_SIZE <= 0:
+        return compute_signal_frame(df, p)
+    key = (symbol, p)
+    frame = None
+    entry = _FRAME_CACHE.get(key)
+    if entry is not None and entry[0].index[0] <= df.index[0]:
+        cached, fingerprints = entry
+        # Try the cached last bar as anchor, then the one before it (last bar was still forming)
+        for back, fingerprint in enumerate(fingerprints):
+            anchor_ts = cached.index[-1 - back]
+            if anchor_ts not in df.index:
+                continue
+            anchor = df.index.get_loc(anchor_ts)
+            if _bar_fingerprint(df, anchor) != fingerprint:
+                continue
+            reused = cached.loc[df.index[0]:anchor_ts]
+            new_bars = len(df) - 1 - anchor
+            if new_bars == 0:
+                frame = reused
+            else:
+                start = max(0, anchor + 1 - max(INDICATOR_CACHE_WARMUP_BARS, p.lookback()))
+                tail = compute_signal_frame(df.iloc[start:], p).iloc[-new_bars:]
+                frame = pd.concat([reused, tail])
+            break
+    if frame is None:
+        frame = compute_signal_frame(df, p)
+    fingerprints = tuple(_bar_fingerprint(df, -1 - back) for back in range(min(2, len(df))))
+    _FRAME_CACHE[key] = (frame, fingerprints)
+    _FRAME_CACHE.move_to_end(key)
+    while len(_FRAME_CACHE) > INDICATOR_CACHE_SIZE:
+        _FRAME_CACHE.popitem(last=False)
+    return frame
+
+
+def signal_from_frame(
+    symbol: str,
+    frame: pd.DataFrame,
+    use_news: bool = True,
+    params: StrategyParams | None = None,
+    news: dict | None = None,
+) -> str:
+    """
+    BUY/SELL/HOLD for the last bar of a compute_signal_frame result, applying the news gate.
+    Matches get_signals_from_df(symbol, df, use_news) for the frame's source df.
+    news (symbol -> sentiment) supplies prefetched sentiment; symbols not in it use the news cache.
+    """
+    if frame is None or frame.empty:
+        return "HOLD"
+    p = params or DEFAULT_PARAMS
+    last = frame.iloc[-1]
+    if last["buy_setup"]:
+        if use_news and not news_allows_buy(symbol, news):
+            return "HOLD"
+        if p.require_above_lower_band and not last["above_lower"]:
+            return "HOLD"
+        return "BUY"
+    if last["sell_setup"]:
+        return "SELL"
+    if last["active"] and use_news and news_suggests_sell(symbol, news):
+        return "SELL"
+    return "HOLD"
+
+
+def get_signals(
+    symbol: str,
+    snapshot: MarketSnapshot | None = None,
+    params: StrategyParams | None = None,
+) -> str:
+    """Live signal: BUY/SELL/HOLD on closed bars from the cycle's snapshot (or a fresh fetch if none given)."""
+    df = snapshot.closed_prices(symbol) if snapshot is not None else closed_bars(get_prices(symbol))
+    if df is None:
+        return "HOLD"
+    news = snapshot.news if snapshot is not None else None
+    return signal_from_frame(symbol, cached_signal_frame(symbol, df, params), use_news=True, params=params, news=news)
@@ -0,0 +1,365 @@
+"""
+Streaming (online) versions of the strategy indicators: each update takes one new bar
+and runs in O(1), instead of recomputing pandas rolling windows over the whole history.
+
+Every class matches its pandas counterpart in strategy.py bar for bar (same warm-up,
+same 0 -> NA -> fill rules), so StreamingSignals gives the same BUY/SELL/HOLD as
+compute_signal_frame on the same bars (news off).
+"""
+
+import math
+from collections import deque
+from params import StrategyParams, DEFAULT_PARAMS
+
+NAN = float("nan")
+
+# Running sums are rebuilt from the window this often to stop float drift on long streams
+_RESUM_EVERY = 1000
+
+
+class RollingSum:
+    """Sum of the last n values. NaN until n values (or if any value in the window is NaN)."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.window: deque = deque()
+        self.total = 0.0
+        self.nonzero = 0
+        self.nans = 0
+        self.updates = 0
+
+    def update(self, x: float) -> float:
+        self.window.append(x)
+        self._add(x, 1)
+        if len(self.window) > self.n:
+            self._add(self.window.popleft(), -1)
+        self.updates += 1
+        if self.updates % _RESUM_EVERY == 0:
+            self.total = math.fsum(v for v in self.window if not math.isnan(v))
+        return self.value
+
+    def _add(self, x: float, sign: int) -> None:
+        if math.isnan(x):
+            self.nans += sign
+        else:
+            self.total += sign * x
+            self.nonzero += sign * (x != 0)
+
+    def _sum(self) -> float:
+        if len(self.window) < self.n or self.nans:
+            return NAN
+        return self.total if self.nonzero else 0.0  # exact 0 when the window is all zeros
+
+    @property
+    def value(self) -> float:
+        return self._sum()
+
+
+class RollingMean(RollingSum):
+    """Mean of the last n values (pandas rolling(n).mean())."""
+
+    @property
+    def value(self) -> float:
+        return self._sum() / self.n
+
+
+class RollingStd:
+    """Rolling mean and sample std (ddof=1) of the last n values, as pandas rolling(n).mean()/.std()."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.window: deque = deque()
+        self.shift = None  # values are summed relative to the first one seen (avoids cancellation)
+        self.s = 0.0
+        self.ss = 0.0
+        self.same_run = 0  # consecutive equal values ending at the latest one
+        self.updates = 0
+
+    def update(self, x: float) -> tuple[float, float]:
+        if self.shift is None:
+            self.shift = x
+        self.same_run = self.same_run + 1 if self.window and self.window[-1] == x else 1
+        self.window.append(x)
+        d = x - self.shift
+        self.s += d
+        self.ss += d * d
+        if len(self.window) > self.n:
+            old = self.window.popleft() - self.shift
+            self.s -= old
+            self.ss -= old * old
+        self.updates += 1
+        if self.updates % _RESUM_EVERY == 0:
+            self.s = math.fsum(v - self.shift for v in self.window)
+            self.ss = math.fsum((v - self.shift) ** 2 for v in self.window)
+        return self.value
+
+    @property
+    def value(self) -> tuple[float, float]:
+        if len(self.window) < self.n:
+            return NAN, NAN
+        mean_d = self.s / self.n
+        if self.same_run >= self.n:
+            return self.window[-1], 0.0  # constant window: std exactly 0
+        var = max((self.ss - self.s * mean_d) / (self.n - 1), 0.0)
+        return self.shift + mean_d, math.sqrt(var)
+
+
+class RollingExtreme:
+    """Rolling min or max of the last n values with a monotonic deque (amortized O(1))."""
+
+    def __init__(self, n: int, mode: str = "min"):
+        self.n = n
+        self.better = (lambda a, b: a <= b) if mode == "min" else (lambda a, b: a >= b)
+        self.queue: deque = deque()  # (index, value), values monotonic
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        while self.queue and self.better(x, self.queue[-1][1]):
+            self.queue.pop()
+        self.queue.append((self.count, x))
+        if self.queue[0][0] <= self.count - self.n:
+            self.queue.popleft()
+        self.count += 1
+        return self.queue[0][1] if self.count >= self.n else NAN
+
+
+class EMA:
+    """Exponential moving average, pandas ewm(span=span, adjust=False).mean()."""
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        self.value = x if math.isnan(self.value) else (1.0 - self.alpha) * self.value + self.alpha * x
+        return self.value
+
+
+class StreamingOBV:
+    """On-Balance Volume and its moving average. update() returns (obv, obv_ma)."""
+
+    def __init__(self, ma_period: int):
+        self.prev_close = NAN
+        self.obv = 0.0
+        self.ma = RollingMean(ma_period)
+
+    def update(self, close: float, volume: float) -> tuple[float, float]:
+        direction = 1 if close > self.prev_close else -1  # first bar (no previous close) counts as down
+        self.prev_close = close
+        self.obv += volume * direction
+        return self.obv, self.ma.update(self.obv)
+
+
+class StreamingRSI:
+    """RSI (0–100), 50 while warming up or when the window has no losses."""
+
+    def __init__(self, period: int):
+        self.prev_close = NAN
+        self.gain = RollingMean(period)
+        self.loss = RollingMean(period)
+
+    def update(self, close: float) -> float:
+        delta = close - self.prev_close
+        self.prev_close = close
+        avg_gain = self.gain.update(delta if delta > 0 else 0.0)
+        avg_loss = self.loss.update(-delta if delta < 0 else 0.0)
+        if math.isnan(avg_gain) or math.isnan(avg_loss) or avg_loss == 0:
+            return 50.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+class StreamingMACD:
+    """MACD line and signal line. update() returns (macd_line, signal_line)."""
+
+    def __init__(self, fast: int, slow: int, signal: int):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def update(self, close: float) -> tuple[float, float]:
+        line = self.fast.update(close) - self.slow.update(close)
+        return line, self.signal.update(line)
+
+
+class StreamingADX:
+    """Average Directional Index (0–100); NaN while warming up."""
+
+    def __init__(self, period: int):
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.prev_close = NAN
+        self.atr = RollingMean(period)
+        self.plus = RollingMean(period)
+        self.minus = RollingMean(period)
+        self.adx = RollingMean(period)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        up = high - self.prev_high
+        down = self.prev_low - low
+        plus_dm = up if (up > down and up > 0) else 0.0
+        minus_dm = down if (down > plus_dm and down > 0) else 0.0  # compared to the filtered +DM, as in _adx
+        tr = high - low
+        if not math.isnan(self.prev_close):
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        atr = self.atr.update(tr)
+        plus_avg = self.plus.update(plus_dm)
+        minus_avg = self.minus.update(minus_dm)
+        dx = NAN
+        if not math.isnan(atr) and atr != 0:
+            plus_di = 100 * (plus_avg / atr)
+            minus_di = 100 * (minus_avg / atr)
+            di_sum = plus_di + minus_di
+            if di_sum != 0:
+                dx = 100 * abs(plus_di - minus_di) / di_sum
+        return self.adx.update(dx)
+
+
+class StreamingMFI:
+    """Money Flow Index (0–100), 50 while warming up or when there is no negative flow."""
+
+    def __init__(self, period: int):
+        self.prev_typical = NAN
+        self.pos = RollingSum(period)
+        self.neg = RollingSum(period)
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        typical = (high + low + close) / 3
+        flow = typical * volume
+        pos = self.pos.update(flow if typical > self.prev_typical else 0.0)
+        neg = self.neg.update(flow if typical < self.prev_typical else 0.0)
+        self.prev_typical = typical
+        if math.isnan(pos) or math.isnan(neg) or neg == 0:
+            return 50.0
+        return 100 - (100 / (1 + pos / neg))
+
+
+class StreamingStochastic:
+    """Stochastic %K and %D. %K is 50 while warming up or when the range is flat."""
+
+    def __init__(self, k_period: int, d_period: int):
+        self.lowest = RollingExtreme(k_period, "min")
+        self.highest = RollingExtreme(k_period, "max")
+        self.d = RollingMean(d_period)
+
+    def update(self, high: float, low: float, close: float) -> tuple[float, float]:
+        lowest_low = self.lowest.update(low)
+        highest_high = self.highest.update(high)
+        span = highest_high - lowest_low
+        k = 50.0 if math.isnan(span) or span == 0 else 100 * (close - lowest_low) / span
+        return k, self.d.update(k)
+
+
+class StreamingBollinger:
+    """Bollinger Bands and price Z-Score over the same rolling window."""
+
+    def __init__(self, period: int, num_std: float):
+        self.stats = RollingStd(period)
+        self.num_std = num_std
+
+    def update(self, close: float) -> tuple[float, float, float, float]:
+        """(lower, middle, upper, zscore); z is NaN when std is 0 or while warming up."""
+        mean, std = self.stats.update(close)
+        z = (close - mean) / std if std and not math.isnan(std) else NAN
+        return mean - self.num_std * std, mean, mean + self.num_std * std, z
+
+
+class StreamingSignals:
+    """
+    Bar-by-bar BUY/SELL/HOLD with the same gates as strategy.compute_signal_frame (news off).
+    Feed bars in order with update(); each call is O(1). The latest gate values are in .gates.
+    """
+
+    def __init__(self, params: StrategyParams | None = None):
+        p = self.params = params or DEFAULT_PARAMS
+        self.bars = 0
+        self.lookback = p.lookback()
+        self.volume = RollingMean(p.volume_avg_days)
+        self.obv = StreamingOBV(p.obv_ma_period)
+        self.closes: deque = deque(maxlen=p.roc_period + 1)
+        self.bollinger = StreamingBollinger(p.bb_period, p.bb_std)
+        self.zscore = StreamingBollinger(p.zscore_period, 0.0)
+        self.rsi = StreamingRSI(p.rsi_period)
+        self.macd = StreamingMACD(p.macd_fast, p.macd_slow, p.macd_signal)
+        self.adx = StreamingADX(p.adx_period)
+        self.mfi = StreamingMFI(p.mfi_period)
+        self.stochastic = StreamingStochastic(p.stoch_k_period, p.stoch_d_period)
+        self.gates: dict = {}
+
+    def update(self, high: float, low: float, close: float, volume: float) -> str:
+        p = self.params
+        self.bars += 1
+        vol_avg = self.volume.update(volume)
+        if vol_avg == 0:
+            vol_ratio = math.inf if volume else NAN
+        else:
+            vol_ratio = volume / vol_avg
+        obv, obv_ma = self.obv.update(close, volume)
+        self.closes.append(close)
+        roc = NAN
+        if len(self.closes) > p.roc_period:
+            roc = (close - self.closes[0]) / self.closes[0]
+        lower_bb, _, _, _ = self.bollinger.update(close)
+        _, _, _, z = self.zscore.update(close)
+        rsi = self.rsi.update(close)
+        macd_line, signal_line = self.macd.update(close)
+        adx = self.adx.update(high, low, close)
+        mfi = self.mfi.update(high, low, close, volume)
+        stoch_k, _ = self.stochastic.update(high, low, close)
+
+        g = self.gates
+        g["vol_ratio"], g["roc"] = vol_ratio, roc
+        g["obv_up"], g["obv_down"] = obv > obv_ma, obv < obv_ma
+        g["above_lower"] = math.isnan(lower_bb) or close > lower_bb
+        g["rsi_ok_buy"], g["rsi_sell"] = True, False
+        if p.use_rsi:
+            g["rsi_ok_buy"] = p.rsi_oversold < rsi < p.rsi_overbought
+            g["rsi_sell"] = rsi >= p.rsi_overbought or rsi <= p.rsi_oversold
+        g["macd_ok_buy"], g["macd_sell"] = True, False
+        if p.use_macd:
+            g["macd_ok_buy"] = macd_line > signal_line or math.isnan(macd_line) or math.isnan(signal_line)
+            g["macd_sell"] = macd_line < signal_line
+        g["adx_ok_buy"] = True
+        if p.use_adx:
+            g["adx_ok_buy"] = adx > p.adx_min or math.isnan(adx)
+        g["mfi_ok_buy"], g["mfi_sell"] = True, False
+        if p.use_mfi:
+            g["mfi_ok_buy"] = p.mfi_oversold < mfi < p.mfi_overbought
+            g["mfi_sell"] = mfi >= p.mfi_overbought or mfi <= p.mfi_oversold
+        g["stoch_ok_buy"], g["stoch_sell"] = True, False
+        if p.use_stochastic:
+            g["stoch_ok_buy"] = p.stoch_oversold < stoch_k < p.stoch_overbought
+            g["stoch_sell"] = stoch_k >= p.stoch_overbought or stoch_k <= p.stoch_oversold
+        g["zscore_ok_buy"], g["zscore_sell"] = True, False
+        if p.use_zscore:
+            g["zscore_ok_buy"] = z <= p.zscore_buy_max or math.isnan(z)
+            g["zscore_sell"] = abs(z) > p.zscore_sell_extreme
+
+        g["active"] = self.bars >= self.lookback and vol_ratio >= p.volume_min_ratio and not math.isnan(roc)
+        g["buy_setup"] = (
+            g["active"]
+            and g["obv_up"]
+            and roc >= p.roc_buy_min
+            and g["rsi_ok_buy"]
+            and g["macd_ok_buy"]
+            and g["adx_ok_buy"]
+            and g["mfi_ok_buy"]
+            and g["stoch_ok_buy"]
+            and g["zscore_ok_buy"]
+        )
+        g["sell_setup"] = g["active"] and not g["buy_setup"] and (
+            g["obv_down"]
+            or roc <= p.roc_sell_max
+            or g["rsi_sell"]
+            or g["macd_sell"]
+            or g["mfi_sell"]
+            or g["stoch_sell"]
+            or g["zscore_sell"]
+        )
+        if g["buy_setup"] and (g["above_lower"] or not p.require_above_lower_band):
+            g["signal"] = "BUY"
+        elif g["sell_setup"]:
+            g["signal"] = "SELL"
+        else:
+            g["signal"] = "HOLD"
+        return g["signal"]
@@ -0,0 +1,119 @@
+"""
+Parameter sweep: run the backtest for every combination of a parameter grid.
+Prices are downloaded once; combinations run in parallel on a process pool and
+results are written as a table ranked by P&L.
+
+Run:
+  python sweep.py --grid RSI_OVERBOUGHT=65,70,75 ADX_MIN=15,20,25 --days 730 --out sweep_results.csv
+"""
+
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+from config import SYMBOLS, get_multiplier
+from data import get_prices
+from params import DEFAULT_PARAMS
+from backtest import backtest_symbol
+
+# Price frames for the worker process, set once per worker by _init_worker (not pickled per task)
+_FRAMES: dict[str, pd.DataFrame] = {}
+
+
+def _init_worker(frames: dict[str, pd.DataFrame]) -> None:
+    global _FRAMES
+    _FRAMES = frames
+
+
+def summarize_trades(all_trades: dict) -> dict:
+    """Trades, win rate, P&L (USD, 1 contract per trade) and max drawdown of the combined trade sequence."""
+    rows = [
+        (exit_date, (exit_price - entry_price) * get_multiplier(symbol))
+        for symbol, trades in all_trades.items()
+        for _, exit_date, entry_price, exit_price, _ in trades
+    ]
+    if not rows:
+        return {"trades": 0, "win_rate": 0.0, "pnl": 0.0, "max_drawdown": 0.0}
+    pnl = pd.DataFrame(rows, columns=["exit_date", "pnl"]).sort_values("exit_date", kind="stable")["pnl"]
+    equity = pnl.cumsum()
+    drawdown = equity - equity.cummax().clip(lower=0.0)
+    return {
+        "trades": len(pnl),
+        "win_rate": float((pnl > 0).mean()),
+        "pnl": float(pnl.sum()),
+        "max_drawdown": float(-drawdown.min()) if drawdown.min() < 0 else 0.0,
+    }
+
+
+def _run_combo(overrides: dict) -> dict:
+    """Backtest one grid point on the worker's shared frames."""
+    params = DEFAULT_PARAMS.with_overrides(**overrides)
+    all_trades = {symbol: backtest_symbol(symbol, df, params) for symbol, df in _FRAMES.items()}
+    return {**overrides, **summarize_trades(all_trades)}
+
+
+def expand_grid(grid: dict[str, list]) -> list[dict]:
+    """Every combination of the grid as a list of {name: value} dicts."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def run_sweep(
+    grid: dict[str, list],
+    days: int = 365,
+    symbols: list[str] | None = None,
+    workers: int | None = None,
+) -> pd.DataFrame:
+    """Backtest every grid combination; returns one row per combination, best P&L first."""
+    combos = expand_grid(grid)
+    for combo in combos:
+        DEFAULT_PARAMS.with_overrides(**combo)  # fail fast on unknown names before starting the pool
+    frames = {}
+    for symbol in symbols or SYMBOLS:
+        df = get_prices(symbol, days=days)
+        if df is not None:
+            frames[symbol] = df
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(frames,)) as pool:
+        results = list(pool.map(_run_combo, combos))
+    table = pd.DataFrame(results)
+    if table.empty:
+        return table
+    return table.sort_values(["pnl", "max_drawdown"], ascending=[False, True], ignore_index=True)
+
+
+def _parse_value(text: str):
+    """Grid value from the command line: bool, int, float, or a tuple written a:b (e.g. SL_TP_TICKS=100:400)."""
+    if ":" in text:
+        return tuple(_parse_value(part) for part in text.split(":"))
+    if text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid-search strategy parameters over the backtest")
+    parser.add_argument("--grid", nargs="+", required=True, metavar="NAME=V1,V2",
+                        help="Parameter and values to try, e.g. RSI_OVERBOUGHT=65,70,75")
+    parser.add_argument("--days", type=int, default=365, help="Days of history to backtest")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: CPU count)")
+    parser.add_argument("--out", default="sweep_results.csv", help="CSV file for the ranked results")
+    args = parser.parse_args()
+
+    grid = {}
+    for item in args.grid:
+        name, _, values = item.partition("=")
+        grid[name] = [_parse_value(v) for v in values.split(",") if v]
+
+    print(f"Sweeping {len(expand_grid(grid))} combinations over {', '.join(SYMBOLS)} ({args.days} days)...")
+    table = run_sweep(grid, days=args.days, workers=args.workers)
+    table.to_csv(args.out, index=False)
+    print(table.head(10).to_string(index=False))
+    print(f"\nFull results: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+True range and ATR (Average True Range), computed once per price frame.
+Series are cached against the frame object (dropped when the frame is garbage-collected, and
+recomputed if bars are appended), so the snapshot, paper trader,
+backtest and strategy read the same arrays instead of rebuilding true range each time.
+"""
+
+import weakref
+import numpy as np
+import pandas as pd
+
+# id(frame) -> (weakref to frame, (rows, last timestamp), {key: Series})
+_CACHE: dict[int, tuple] = {}
+
+
+def true_range_array(high, low, close) -> np.ndarray:
+    """max(high − low, |high − prev close|, |low − prev close|) per bar; first bar is high − low."""
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    prev_close = np.empty_like(close)
+    prev_close[:1] = np.nan
+    prev_close[1:] = close[:-1]
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def _frame_cache(df: pd.DataFrame) -> dict:
+    """Per-frame dict of computed series (reset if bars were appended since last use)."""
+    key = id(df)
+    fingerprint = (len(df), df.index[-1] if len(df) else None)
+    entry = _CACHE.get(key)
+    if entry is None or entry[0]() is not df or entry[1] != fingerprint:
+        entry = (weakref.ref(df, lambda _, key=key: _CACHE.pop(key, None)), fingerprint, {})
+        _CACHE[key] = entry
+    return entry[2]
+
+
+def true_range(df: pd.DataFrame) -> pd.Series:
+    """True range for every bar of df (cached per frame)."""
+    cache = _frame_cache(df)
+    if "tr" not in cache:
+        cache["tr"] = pd.Series(true_range_array(df["High"], df["Low"], df["Close"]), index=df.index)
+    return cache["tr"]
+
+
+def atr_series(df: pd.DataFrame, period: int = 14) -> pd.Series:
+    """ATR (Average True Range) for every bar of df, in price units (NaN while warming up)."""
+    cache = _frame_cache(df)
+    key = ("atr", period)
+    if key not in cache:
+        cache[key] = true_range(df).rolling(period).mean()
+    return cache[key]
+
+
+def atr_ratio_series(df: pd.DataFrame, period: int = 14, ma_days: int = 20) -> pd.Series:
+    """ATR_ma / ATR_current for every bar (high vol -> smaller ratio)."""
+    cache = _frame_cache(df)
+    key = ("atr_ratio", period, ma_days)
+    if key not in cache:
+        atr = atr_series(df, period)
+        cache[key] = atr.rolling(ma_days).mean() / atr
+    return cache[key]
+
+
+def sl_tp_distance_series(
+    df: pd.DataFrame,
+    period: int = 14,
+    stop_mult: float = 1.0,
+    reward_ratio: float = 4.0,
+    fixed: tuple[float, float] | None = None,
+) -> pd.DataFrame:
+    """
+    Stop and target distances for a long entered at each bar (columns risk, reward): stop_mult × ATR
+    and reward_ratio × that; bars without a usable ATR (see atr_at) get 0.01 / 0.01 × reward_ratio.
+    fixed=(risk, reward) puts those distances on every bar instead (tick-based SL/TP).
+    """
+    cache = _frame_cache(df)
+    key = ("sl_tp", period, stop_mult, reward_ratio, fixed)
+    if key not in cache:
+        if fixed is not None:
+            risk = np.full(len(df), float(fixed[0]))
+            reward = np.full(len(df), float(fixed[1]))
+        else:
+            atr = atr_series(df, period).to_numpy()
+            usable = (np.arange(len(df)) + 1 >= period + 2) & (atr > 0)
+            risk = np.where(usable, stop_mult * atr, 0.01)
+            reward = np.where(usable, reward_ratio * risk, 0.01 * reward_ratio)
+        cache[key] = pd.DataFrame({"risk": risk, "reward": reward}, index=df.index)
+    return cache[key]
+
+
+def atr_at(df: pd.DataFrame, row: int, period: int = 14) -> float | None:
+    """ATR at bar row, as if df ended there. None if not enough data."""
+    if row + 1 < period + 2:
+        return None
+    val = atr_series(df, period).iat[row]
+    if pd.isna(val) or val <= 0:
+        return None
+    return float(val)
+
+
+def atr_ratio_at(df: pd.DataFrame, row: int, period: int = 14, ma_days: int = 20) -> float | None:
+    """ATR ratio at bar row, as if df ended there. None if not enough data."""
+    if row + 1 < period + ma_days:
+        return None
+    atr_current = atr_series(df, period).iat[row]
+    ratio = atr_ratio_series(df, period, ma_days).iat[row]
+    if pd.isna(atr_current) or pd.isna(ratio) or atr_current <= 0:
+        return None
+    return float(ratio)
+
+
+def atr_from_df(df: pd.DataFrame, period: int = 14) -> float | None:
+    """ATR (Average True Range) at the last bar of df, in price units. None if not enough data."""
+    if df is None or len(df) == 0:
+        return None
+    return atr_at(df, len(df) - 1, period)
+
+
+def atr_ratio_from_df(df: pd.DataFrame, period: int = 14, ma_days: int = 20) -> float | None:
+    """ATR_ma / ATR_current at the last bar of df (high vol -> smaller ratio). None if not enough data."""
+    if df is None or len(df) == 0:
+        return None
+    return atr_ratio_at(df, len(df) - 1, period, ma_days)
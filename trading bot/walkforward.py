@@ -0,0 +1,239 @@
+"""
+Walk-forward optimization: on each rolling in-sample window pick the best grid combination
+(by P&L, then drawdown), then trade it on the following out-of-sample window. The OOS trades
+of all folds are stitched into one equity curve.
+Prices are downloaded once and placed in shared memory; worker processes map them read-only,
+so each task only carries its window and parameter overrides.
+
+Run:
+  python walkforward.py --grid RSI_OVERBOUGHT=65,70,75 ADX_MIN=15,20,25 SL_TP_TICKS=50:200,100:400 \\
+      --days 1825 --is-days 365 --oos-days 90
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+from config import SYMBOLS, INITIAL_BALANCE
+from data import get_prices
+from params import DEFAULT_PARAMS
+from backtest import backtest_symbol
+from report import trades_frame, equity_curve, summarize
+from sweep import expand_grid, summarize_trades, _parse_value
+
+BAR_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+@dataclass(frozen=True)
+class SharedFrames:
+    """Names of the shared-memory blocks holding all symbols' bars, and where each symbol sits in them."""
+
+    values_name: str   # float64 (rows, len(BAR_COLUMNS))
+    index_name: str    # int64 ns timestamps (rows,)
+    rows: int
+    layout: tuple      # (symbol, offset, length, tz) per symbol
+
+
+def share_frames(frames: dict[str, pd.DataFrame]) -> tuple[SharedFrames, list[shared_memory.SharedMemory]]:
+    """Copy bars into two shared-memory blocks. Caller must close() and unlink() the returned blocks."""
+    rows = sum(len(df) for df in frames.values())
+    values_shm = shared_memory.SharedMemory(create=True, size=max(1, rows * len(BAR_COLUMNS) * 8))
+    index_shm = shared_memory.SharedMemory(create=True, size=max(1, rows * 8))
+    values = np.ndarray((rows, len(BAR_COLUMNS)), dtype=np.float64, buffer=values_shm.buf)
+    index = np.ndarray((rows,), dtype=np.int64, buffer=index_shm.buf)
+    layout, offset = [], 0
+    for symbol, df in frames.items():
+        n = len(df)
+        for c, col in enumerate(BAR_COLUMNS):
+            values[offset: offset + n, c] = df[col].to_numpy(dtype=float) if col in df else np.nan
+        dates = pd.DatetimeIndex(df.index)
+        index[offset: offset + n] = dates.as_unit("ns").asi8
+        layout.append((symbol, offset, n, str(dates.tz) if dates.tz is not None else None))
+        offset += n
+    del values, index  # release the buffer views so the blocks can be closed
+    return SharedFrames(values_shm.name, index_shm.name, rows, tuple(layout)), [values_shm, index_shm]
+
+
+def attach_frames(shared: SharedFrames) -> tuple[dict[str, pd.DataFrame], list[shared_memory.SharedMemory]]:
+    """DataFrames backed by the shared blocks (no copy of the price data). Keep the blocks referenced while in use."""
+    values_shm = shared_memory.SharedMemory(name=shared.values_name)
+    index_shm = shared_memory.SharedMemory(name=shared.index_name)
+    values = np.ndarray((shared.rows, len(BAR_COLUMNS)), dtype=np.float64, buffer=values_shm.buf)
+    index = np.ndarray((shared.rows,), dtype=np.int64, buffer=index_shm.buf)
+    values.flags.writeable = False
+    frames = {}
+    for symbol, offset, n, tz in shared.layout:
+        dates = pd.DatetimeIndex(index[offset: offset + n].view("M8[ns]"))
+        if tz is not None:
+            dates = dates.tz_localize("UTC").tz_convert(tz)
+        frames[symbol] = pd.DataFrame(
+            {col: values[offset: offset + n, c] for c, col in enumerate(BAR_COLUMNS)}, index=dates, copy=False
+        )
+    return frames, [values_shm, index_shm]
+
+
+# Worker state, set once per process by _init_worker
+_FRAMES: dict[str, pd.DataFrame] = {}
+_SHM: list = []
+
+
+def _init_worker(shared: SharedFrames) -> None:
+    global _FRAMES, _SHM
+    _FRAMES, _SHM = attach_frames(shared)
+
+
+def window_trades(
+    frames: dict[str, pd.DataFrame],
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    overrides: dict,
+) -> dict:
+    """
+    Backtest trades entered in [start, end) with the given overrides. Each symbol gets its
+    indicator lookback of bars before start as warm-up; trades still open at end are dropped.
+    """
+    params = DEFAULT_PARAMS.with_overrides(**overrides)
+    warmup = params.lookback()
+    all_trades = {}
+    for symbol, df in frames.items():
+        i0, i1 = df.index.searchsorted(start), df.index.searchsorted(end)
+        trades = backtest_symbol(symbol, df.iloc[max(0, i0 - warmup): i1], params)
+        all_trades[symbol] = [t for t in trades if t[0] >= start]
+    return all_trades
+
+
+def _score_task(task: tuple) -> dict:
+    """In-sample summary of one (fold, combination) on the worker's shared frames."""
+    fold, combo, start, end, overrides = task
+    return {"fold": fold, "combo": combo, **summarize_trades(window_trades(_FRAMES, start, end, overrides))}
+
+
+def _oos_task(task: tuple) -> dict:
+    """Out-of-sample trades of one fold with its chosen combination."""
+    _, start, end, overrides = task
+    return window_trades(_FRAMES, start, end, overrides)
+
+
+def make_folds(
+    frames: dict[str, pd.DataFrame],
+    is_days: int,
+    oos_days: int,
+) -> list[tuple[pd.Timestamp, pd.Timestamp, pd.Timestamp]]:
+    """(is_start, oos_start, oos_end) per fold; windows roll forward by oos_days."""
+    first = min(df.index[0] for df in frames.values())
+    last = max(df.index[-1] for df in frames.values())
+    folds = []
+    start = first
+    while start + pd.Timedelta(days=is_days) <= last:
+        oos_start = start + pd.Timedelta(days=is_days)
+        oos_end = min(oos_start + pd.Timedelta(days=oos_days), last + pd.Timedelta(seconds=1))
+        folds.append((start, oos_start, oos_end))
+        start += pd.Timedelta(days=oos_days)
+    return folds
+
+
+def run_walkforward(
+    grid: dict[str, list],
+    days: int = 1825,
+    is_days: int = 365,
+    oos_days: int = 90,
+    symbols: list[str] | None = None,
+    workers: int | None = None,
+    initial_balance: float = INITIAL_BALANCE,
+) -> dict:
+    """
+    Returns {"folds": one row per fold (windows, chosen overrides, IS and OOS stats),
+    "trades": stitched OOS trades table, "equity": OOS equity curve, "summary": OOS metrics}.
+    """
+    combos = expand_grid(grid)
+    for combo in combos:
+        DEFAULT_PARAMS.with_overrides(**combo)  # fail fast on unknown names before starting the pool
+    frames = {}
+    for symbol in symbols or SYMBOLS:
+        df = get_prices(symbol, days=days)
+        if df is not None and len(df):
+            frames[symbol] = df
+    folds = make_folds(frames, is_days, oos_days) if frames else []
+    if not folds:
+        empty = trades_frame({})
+        return {"folds": pd.DataFrame(), "trades": empty, "equity": equity_curve(empty), "summary": {"trades": 0}}
+
+    shared, blocks = share_frames(frames)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared,)) as pool:
+            tasks = [
+                (f, c, is_start, oos_start, combo)
+                for f, (is_start, oos_start, _) in enumerate(folds)
+                for c, combo in enumerate(combos)
+            ]
+            scores = pd.DataFrame(list(pool.map(_score_task, tasks, chunksize=max(1, len(tasks) // 64))))
+            best = (
+                scores.sort_values(["fold", "pnl", "max_drawdown", "combo"], ascending=[True, False, True, True])
+                .groupby("fold", sort=True).head(1).set_index("fold")
+            )
+            oos_tasks = [(f, folds[f][1], folds[f][2], combos[int(best.loc[f, "combo"])]) for f in range(len(folds))]
+            oos_results = list(pool.map(_oos_task, oos_tasks))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    rows, stitched = [], {symbol: [] for symbol in frames}
+    for f, ((is_start, oos_start, oos_end), oos) in enumerate(zip(folds, oos_results)):
+        for symbol, trades in oos.items():
+            stitched[symbol].extend(trades)
+        oos_stats = summarize_trades(oos)
+        rows.append({
+            "fold": f, "is_start": is_start, "oos_start": oos_start, "oos_end": oos_end,
+            **combos[int(best.loc[f, "combo"])],
+            "is_trades": int(best.loc[f, "trades"]), "is_pnl": float(best.loc[f, "pnl"]),
+            "oos_trades": oos_stats["trades"], "oos_pnl": oos_stats["pnl"], "oos_win_rate": oos_stats["win_rate"],
+        })
+    trades = trades_frame(stitched)
+    equity = equity_curve(trades, initial_balance)
+    return {
+        "folds": pd.DataFrame(rows),
+        "trades": trades,
+        "equity": equity,
+        "summary": summarize(trades, equity, initial_balance),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward optimization of strategy parameters (news off)")
+    parser.add_argument("--grid", nargs="+", required=True, metavar="NAME=V1,V2",
+                        help="Parameter and values to try, e.g. ADX_MIN=15,20,25 SL_TP_TICKS=50:200,100:400")
+    parser.add_argument("--days", type=int, default=1825, help="Days of history")
+    parser.add_argument("--is-days", type=int, default=365, help="In-sample window (days)")
+    parser.add_argument("--oos-days", type=int, default=90, help="Out-of-sample window and step (days)")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: CPU count)")
+    parser.add_argument("--out", default="walkforward", help="File prefix: <out>_folds.csv, <out>_equity.csv")
+    args = parser.parse_args()
+
+    grid = {}
+    for item in args.grid:
+        name, _, values = item.partition("=")
+        grid[name] = [_parse_value(v) for v in values.split(",") if v]
+
+    print(f"Walk-forward: {len(expand_grid(grid))} combinations, IS {args.is_days}d / OOS {args.oos_days}d "
+          f"over {', '.join(SYMBOLS)} ({args.days} days)...")
+    result = run_walkforward(grid, args.days, args.is_days, args.oos_days, workers=args.workers)
+    if result["folds"].empty:
+        print("  Not enough data for one fold.")
+        return
+    result["folds"].to_csv(f"{args.out}_folds.csv", index=False)
+    result["equity"].to_csv(f"{args.out}_equity.csv")
+    print(result["folds"].to_string(index=False))
+    summary = result["summary"]
+    if summary["trades"]:
+        print(f"\n  OOS trades: {summary['trades']}  P&L: ${summary['total_pnl']:,.2f}  "
+              f"Win rate: {summary['win_rate']:.1%}  Max drawdown: {summary['max_drawdown']:.2%}  "
+              f"Sharpe: {summary['sharpe']:.2f}")
+    print(f"\n  Folds: {args.out}_folds.csv  OOS equity: {args.out}_equity.csv")
+
+
+if __name__ == "__main__":
+    main()